@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class LRUCache:
+    """
+    A size-bounded, thread-safe least-recently-used cache with hit, miss and eviction counters.
+    """
+    def __init__(self, maxsize=4096):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+        maxsize (int): Maximum number of entries kept before the least recently used are evicted.
+        """
+        if type(maxsize) != int or maxsize < 1:
+            raise ValueError("\"maxsize\" is not a positive integer, please input a positive integer.")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __contains__(self, key):
+        return key in self.entries
+    
+    def get(self, key, default=None):
+        """
+        Returns the value stored for a key and marks it as most recently used.
+
+        Parameters:
+        key: Key to look up.
+        default: Value returned when the key is not cached.
+
+        Returns:
+        The cached value, or `default` if the key is not cached.
+        """
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries beyond `maxsize`.
+
+        Parameters:
+        key: Key to store.
+        value: Value to store.
+        """
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def resize(self, maxsize):
+        """
+        Changes the maximum number of entries, evicting the least recently used ones if needed.
+
+        Parameters:
+        maxsize (int): New maximum number of entries.
+        """
+        if type(maxsize) != int or maxsize < 1:
+            raise ValueError("\"maxsize\" is not a positive integer, please input a positive integer.")
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+        CacheInfo: Named tuple of hits, misses, evictions, maxsize and currsize.
+        """
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.entries))
@@ -1,3 +1,4 @@
+import itertools
 import numpy as np
 import pandas as pd
 import re
@@ -7,47 +8,93 @@ from ..utils.clean import *
 from ..utils.tokenize import *
 from ..letters import *
 from .recognizor import Recognizer
+from .cache import LRUCache
+from .lexicon import get_lexicon
+
+
+# Columns of the syllable components returned by recognization_syllable(), and of the spell check result
+COMPONENT_COLUMNS = ["原字", "前加字", "上加字", "基字", "下加字", "再下加字", "元音", "后加字", "再后加字"]
+CHECK_COLUMN = "拼写检查"
+# Columns of the start and end character offsets of each syllable in the analyzed text
+OFFSET_COLUMNS = ["起始位置", "结束位置"]
+# Characters on which recognization_syllable() splits a syllable
+SEPARATOR = re.compile(r"[་།\n]")
 
 
 class Checker(Recognizer):
     """
     A class for recognizing Tibetan syllable components based on a memristive network.
+
+    A Checker can be shared by several threads: its syllable cache is locked, and the tables it
+    fills as it goes are only ever given the same values.
     """
-    def __init__(self):
+    def __init__(self, backend='memristor', cache_size=None, lexicon=None):
         """
         Initializes the class with predefined Tibetan characters, punctuation, and memristor settings.
+
+        Parameters:
+        backend (str): 'memristor' (default) to recognize with simulated crossbar arrays, or
+                       'table' to use exact lookup tables with identical results.
+        cache_size (int, optional): Number of distinct syllables whose components and spell check
+                                    result are kept in an LRU cache. No cache is used if None.
+        lexicon (str or set, optional): Set of valid syllables, or the path of a lexicon file built
+                                        if missing, with which check_syllable() answers by a
+                                        membership test. The rules are used if None.
         """
-        self.prefix_letters = PERFIX_LETTER
-        self.root_letters = ROOT_LETTER
-        self.root_letters_short = ROOT_LETTER_SHORT
-        self.superscript_letters = SUPERSCRIPT_LETTER
-        self.subscript_letters = SUBSCRIPT_LETTER
-        self.farther_subscript_letters = FARTHER_SUBSCRIPT_LETTER
-        self.suffix_letters = SUFFIX_LETTER
-        self.farther_suffix_letters = FARTHER_SHUFFIX_LETTER
-        self.vowel = VOWEL
-        self.stop = STOP
-        self.punctuations = PUNCTUATION
-        self.number = NUMBER
-        self.root_letters = self.root_letters + self.number
+        super().__init__(backend)
+        self.cache = LRUCache(cache_size) if cache_size is not None else None
+        if type(lexicon) == str:
+            lexicon = get_lexicon(lexicon)
+        self.lexicon = frozenset(lexicon) if lexicon is not None else None
+    
+    def cache_info(self):
+        """
+        Returns the syllable cache statistics.
 
-        self.prefix_root_relation = PREFIX_ROOT_RELATION
-        self.superscript_root_relation = SUPERSCRIPT_ROOT_RELATION
-        self.subscript_root_relation = SUBSCRIPT_ROOT_RELATION
-        self.suffix_relation = SUFFIX_RELATION
+        Returns:
+        CacheInfo: Named tuple of hits, misses, evictions, maxsize and currsize, or None if the
+                   checker has no cache.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.info()
+    
+    def cache_clear(self):
+        """
+        Removes all syllables from the cache and resets its statistics.
+        """
+        if self.cache is not None:
+            self.cache.clear()
+    
+    def analyze_words(self, word_list):
+        """
+        Recognizes and checks a list of syllables, classifying only those not found in the cache.
 
-        self.mem = memristor()
+        Parameters:
+        word_list (list): List of Tibetan syllables.
 
-        # Binary encodings for different character sets
-        self.prefix_letters_code = get_bin_list(self.prefix_letters)
-        self.superscript_letters_code = get_bin_list(self.superscript_letters)
-        self.root_letters_code = get_bin_list(self.root_letters)
-        self.root_letters_short_code = get_bin_list(self.root_letters_short)
-        self.subscript_letters_code = get_bin_list(self.subscript_letters)
-        self.farther_subscript_letters_code = get_bin_list(self.farther_subscript_letters)
-        self.suffix_letters_code = get_bin_list(self.suffix_letters)
-        self.farther_suffix_letters_code = get_bin_list(self.farther_suffix_letters)
-        self.vowel_code = get_bin_list(self.vowel)
+        Returns:
+        list: (tibetan_att, if_true) for each syllable, where tibetan_att is the dictionary
+              returned by recognization_syllable() and if_true the result of check_syllable().
+        """
+        if self.cache is None:
+            results = []
+            for word, tibetan_match in zip(word_list, self.classify_words(word_list)):
+                tibetan_att = self.recognize_syllable(word, tibetan_match)
+                results.append((tibetan_att, self.check_components(tibetan_att)))
+            return results
+        
+        results = [self.cache.get(word) for word in word_list]
+        missing = list(dict.fromkeys(word for word, result in zip(word_list, results) if result is None))
+        computed = {}
+        for word, tibetan_match in zip(missing, self.classify_words(missing)):
+            tibetan_att = self.recognize_syllable(word, tibetan_match)
+            computed[word] = (tibetan_att, self.check_components(tibetan_att))
+            self.cache.put(word, computed[word])
+        for i, word in enumerate(word_list):
+            if results[i] is None:
+                results[i] = computed[word]
+        return [(dict(tibetan_att), if_true) for tibetan_att, if_true in results]
     
     def convert_sanskrit(self, text):
         """
@@ -64,40 +111,127 @@ class Checker(Recognizer):
                 text[i] = 'སིགས'
         return text
     
-    def recognization_text(self, text):
+    def split_text(self, text):
         """
-        Performs Tibetan syllable recognition on input text.
+        Cleans a text and splits it into syllables.
 
         Parameters:
         text (str): Input text containing Tibetan syllables.
 
         Returns:
-        pd.DataFrame: DataFrame containing recognized syllable components.
+        list: The non-empty syllables of the text, in order.
+        """
+        return list(iter_syllables(text))
+    
+    def analyze(self, text, component_recognization=True, spelling_check=True, offsets=False):
+        """
+        Recognizes the components of every syllable in a text and checks its spelling in a single
+        pass, tokenizing the text once and recognizing each syllable once.
+
+        Parameters:
+        text (str): Input text containing Tibetan syllables.
+        component_recognization (bool): If True, the result contains the syllable components.
+        spelling_check (bool): If True, the result contains the spell check result.
+        offsets (bool): If True, the result contains the start and end offsets of each syllable
+                        in `text`.
+
+        Returns:
+        pd.DataFrame: DataFrame with the "原字" column, the component columns if
+                      component_recognization, the "拼写检查" column if spelling_check and the
+                      "起始位置" and "结束位置" columns if offsets, or None if neither
+                      component_recognization nor spelling_check is requested.
         """
         if type(text) != str: 
             raise ValueError("\"text\" is not a string, please input a string.")
-        text = only_tibetan_clean(text)
-        text = punctuation_clean(text)
-        sentences = punctuation_split_sentence(text)
-        tibetan_components = []
+        if offsets:
+            spans = list(iter_syllable_spans(text))
+            return self.analyze_syllables([span[0] for span in spans], component_recognization,
+                                          spelling_check, spans)
+        return self.analyze_syllables(self.split_text(text), component_recognization, spelling_check)
+    
+    def iter_analyze(self, stream, component_recognization=True, spelling_check=True, batch_size=65536,
+                     offsets=False):
+        """
+        Analyzes a text stream lazily, reading it in chunks and yielding the results of every
+        `batch_size` syllables, so memory stays bounded however large the text is.
+
+        Parameters:
+        stream (file or iterable): Text file object, or iterable of text chunks.
+        component_recognization (bool): If True, the results contain the syllable components.
+        spelling_check (bool): If True, the results contain the spell check result.
+        batch_size (int): Number of syllables in each result.
+        offsets (bool): If True, the results contain the start and end offsets of each syllable
+                        in the whole stream.
+
+        Returns:
+        Iterator[pd.DataFrame]: Results as returned by analyze(), one per batch of syllables.
+        """
+        syllables = iter_syllable_spans_stream(stream) if offsets else iter_syllables_stream(stream)
+        while True:
+            batch = list(itertools.islice(syllables, batch_size))
+            if not batch:
+                return
+            if offsets:
+                yield self.analyze_syllables([span[0] for span in batch], component_recognization,
+                                             spelling_check, batch)
+            else:
+                yield self.analyze_syllables(batch, component_recognization, spelling_check)
+    
+    def analyze_syllables(self, word_list, component_recognization=True, spelling_check=True, spans=None):
+        """
+        Recognizes and checks a list of syllables.
+
+        Parameters:
+        word_list (list): List of Tibetan syllables.
+        component_recognization (bool): If True, the result contains the syllable components.
+        spelling_check (bool): If True, the result contains the spell check result.
+        spans (list, optional): (syllable, start, end) of each syllable, as yielded by
+                                iter_syllable_spans(), whose offsets are added to the result.
+
+        Returns:
+        pd.DataFrame: Result as returned by analyze().
+        """
+        if component_recognization:
+            columns = COMPONENT_COLUMNS + [CHECK_COLUMN] if spelling_check else COMPONENT_COLUMNS
+        elif spelling_check:
+            columns = ["原字", CHECK_COLUMN]
+        else:
+            return None
         
-        for sentence in sentences:
-            word_list = split_word(sentence)
-            word_list = split_number(word_list)
-            #word_list = split_auxiliary(word_list)
+        rows = []
+        if not component_recognization and self.lexicon is not None:
             for word in word_list:
-                if len(word):
-                    tibetan_att = self.recognization_syllable(word)
-                    tibetan_components.append(list(tibetan_att.values()))
-        tibetan_components = pd.DataFrame(tibetan_components, columns=tibetan_att.keys())
-        return tibetan_components
+                rows.append([word, self.check_syllable(word)])
+        else:
+            for tibetan_att, if_true in self.analyze_words(word_list):
+                tibetan_att[CHECK_COLUMN] = if_true
+                rows.append([tibetan_att[column] for column in columns])
+        if spans is not None:
+            for row, (_, start, end) in zip(rows, spans):
+                row.extend((start, end))
+            columns = columns + OFFSET_COLUMNS
+        return pd.DataFrame(rows, columns=columns)
     
-    def recognization_syllable(self, tibetan):
+    def recognization_text(self, text):
+        """
+        Performs Tibetan syllable recognition on input text.
+
+        Parameters:
+        text (str): Input text containing Tibetan syllables.
+
+        Returns:
+        pd.DataFrame: DataFrame containing recognized syllable components.
+        """
+        return self.analyze(text, spelling_check=False)
+    
+    def recognization_syllable(self, tibetan, tibetan_match=None):
         """
         Recognizes and categorizes the components of a Tibetan syllable based on specific character relationships.
         
         Parameters:
         tibetan (str): A Tibetan syllable as input to be analyzed and categorized into components.
+        tibetan_match (list, optional): Class matches of the syllable's characters from classify(),
+                                        computed here if not given.
         
         Returns:
         dict: A dictionary with the following keys:
@@ -113,46 +247,41 @@ class Checker(Recognizer):
         """
         if type(tibetan) != str: 
             raise ValueError("\"tibetan\" is not a string, please input a string.")
-        
-        three_jhz = ['བགས', 'མབས', 'གགས', 'བངས', 'དངས', 'གངས', 'འངས',
-                     'གམས', 'མམས', 'བབས', 'མངས', 'གབས', 'བམས', 'འམམ']
-        tibetan_att = {"原字": tibetan, "前加字": None, "上加字": None, "基字": None, "下加字": None,
-                       "再下加字": None, "元音": None, "后加字": None, "再后加字": None}
-        tibetan_code = get_bin_list(tibetan)
+        if self.cache is not None:
+            return self.analyze_words([tibetan])[0][0]
+        return self.recognize_syllable(tibetan, tibetan_match)
+    
+    def recognize_syllable(self, tibetan, tibetan_match=None):
+        """
+        Recognizes the components of a Tibetan syllable without using the cache.
+
+        Parameters:
+        tibetan (str): A Tibetan syllable as input to be analyzed and categorized into components.
+        tibetan_match (list, optional): Class matches of the syllable's characters from classify(),
+                                        computed here if not given.
+
+        Returns:
+        dict: The components of the syllable, as described in recognization_syllable().
+        """
+        tibetan_att = dict.fromkeys(COMPONENT_COLUMNS)
+        tibetan_att["原字"] = tibetan
+        if tibetan_match is None:
+            tibetan_match = self.classify_words([tibetan])[0]
         
         # component recognization
-        for tibetan in re.split(r"[་།\n]", tibetan):
-            # 1 component
-            if len(tibetan_code) == 1:
-                tibetan_att["基字"] = self.match(tibetan_code[0], 'root_letters')
-            
-            # 2 components
-            elif len(tibetan_code) == 2:
-                tibetan_att = self.recognize_two_components(tibetan, tibetan_code, tibetan_att)
-                
-            # 3 components
-            elif len(tibetan) == 3:
-                tibetan_att = self.recognize_three_components(tibetan, tibetan_code, tibetan_att)
-                        
-            # 4 components
-            elif len(tibetan) == 4:
-                tibetan_att = self.recognize_four_components(tibetan, tibetan_code, tibetan_att)
+        for tibetan in SEPARATOR.split(tibetan):
+            # 1 or 2 components
+            if len(tibetan_match) in (1, 2):
+                length = len(tibetan_match)
             
-            # 5 components
-            elif len(tibetan) == 5:
-                tibetan_att = self.recognize_five_components(tibetan, tibetan_code, tibetan_att)
-                
-            # 6 components
-            elif len(tibetan) == 6:
-                tibetan_att = self.recognize_six_components(tibetan, tibetan_code, tibetan_att)
-                    
-            # 7 components
-            elif len(tibetan) == 7:
-                tibetan_att = self.recognize_seven_components(tibetan, tibetan_code, tibetan_att)
+            # 3 to 7 components
+            elif 3 <= len(tibetan) <= 7:
+                length = len(tibetan)
                 
             # over 7 components
             else:
                 continue
+            tibetan_att = self.recognize_components(tibetan, tibetan_match, tibetan_att, length)
         
         if tibetan_att["基字"] in self.root_letters_short:
             tibetan_att["基字"] = short_to_tall(tibetan_att["基字"])
@@ -170,55 +299,56 @@ class Checker(Recognizer):
         DataFrame: A DataFrame containing the attributes of each syllable and a spelling check result 
                 for each word.
         """
-        if type(text) != str: 
-            raise ValueError("\"text\" is not a string, please input a string.")
-        text = only_tibetan_clean(text)
-        text = punctuation_clean(text)
-        sentences = punctuation_split_sentence(text)
-        check_result = []
-        for sentence in sentences:
-            word_list = split_word(sentence)
-            word_list = split_number(word_list)
-            #word_list = split_auxiliary(word_list)
-            #word_list = self.convert_sanskrit(word_list)
-            for word in word_list:
-                if len(word):
-                    tibetan_att = self.recognization_syllable(word)
-                    if_true = self.check_syllable(word)
-                    check_result.append([tibetan_att["原字"], if_true])
-        check_result = pd.DataFrame(check_result, columns=["原字", "拼写检查"])
-        return check_result
+        return self.analyze(text, component_recognization=False)
     
-    def check_syllable(self, tibetan):
+    def check_syllable(self, tibetan, tibetan_match=None):
         """
         Checks if a given Tibetan syllable conforms to grammatical rules regarding prefixes, 
         superscripts, subscripts, and suffixes.
+        With a lexicon, the syllable is looked up in the set of valid syllables instead.
 
         Parameters:
         tibetan (str): A Tibetan syllable to be checked.
+        tibetan_match (list, optional): Class matches of the syllable's characters from classify().
 
         Returns:
         bool: True if the syllable conforms to the rules, False otherwise.
         """
         if type(tibetan) != str: 
             raise ValueError("\"text\" is not a string, please input a string.")
-        tibetan_att = self.recognization_syllable(tibetan)
+        if self.lexicon is not None and not SEPARATOR.search(tibetan):
+            return tibetan in self.lexicon
+        if self.cache is not None:
+            return self.analyze_words([tibetan])[0][1]
+        return self.check_components(self.recognize_syllable(tibetan, tibetan_match))
+    
+    def check_components(self, tibetan_att):
+        """
+        Checks recognized syllable components against the prefix, superscript, subscript and
+        suffix relation rules.
+
+        Parameters:
+        tibetan_att (dict): Components of a syllable, as returned by recognization_syllable().
+
+        Returns:
+        bool: True if the components conform to the rules, False otherwise.
+        """
         if tibetan_att['基字'] is None:
             return False
         if tibetan_att['前加字'] is not None:
-            if not self.match_ori(tibetan_att['基字'], self.prefix_root_relation[tibetan_att['前加字']]):
+            if not self.related('prefix_root', tibetan_att['前加字'], tibetan_att['基字']):
                 return False
         if tibetan_att['上加字'] is not None:
-            if not self.match_ori(tibetan_att['基字'], self.superscript_root_relation[tibetan_att['上加字']]):
+            if not self.related('superscript_root', tibetan_att['上加字'], tibetan_att['基字']):
                 return False
         if tibetan_att['下加字'] is not None:
-            if not self.match_ori(tibetan_att['基字'], self.subscript_root_relation[tibetan_att['下加字']]):
+            if not self.related('subscript_root', tibetan_att['下加字'], tibetan_att['基字']):
                 return False
         if tibetan_att['再下加字'] is not None:
-            if not self.match_ori(tibetan_att['基字'], self.subscript_root_relation[tibetan_att['再下加字']]):
+            if not self.related('subscript_root', tibetan_att['再下加字'], tibetan_att['基字']):
                 return False
         if tibetan_att['后加字'] is not None and tibetan_att['再后加字'] is not None:
-            if not self.match_ori(tibetan_att['后加字'], self.suffix_relation[tibetan_att['再后加字']]):
+            if not self.related('suffix', tibetan_att['再后加字'], tibetan_att['后加字']):
                 return False
         return True
             
@@ -0,0 +1,131 @@
+import gzip
+import itertools
+import os
+from .recognizor import SYLLABLE_RULES, RULES_VERSION
+
+
+LEXICON_HEADER = "# BoCheck lexicon "
+
+
+def enumerate_syllables(recognizer):
+    """
+    Enumerates every syllable whose characters match the class sequence of a syllable rule, which
+    includes every syllable the rules can accept.
+
+    Parameters:
+    recognizer (Recognizer): Recognizer providing the letters of each character class.
+
+    Returns:
+    list: Sorted list of candidate syllables, without duplicates.
+    """
+    syllables = set()
+    for rules in SYLLABLE_RULES.values():
+        for classes, components, _ in rules:
+            if components is None:
+                continue
+            letters = [getattr(recognizer, candidate) for candidate in classes]
+            syllables.update(map(''.join, itertools.product(*letters)))
+    return sorted(syllables)
+
+
+def build_lexicon(checker=None):
+    """
+    Builds the set of valid syllables by checking every enumerated syllable with the rules.
+    Syllables on which the rules raise an error are left out.
+
+    Parameters:
+    checker (Checker, optional): Checker whose check_syllable() decides validity, a Checker with
+                                 the 'table' backend by default.
+
+    Returns:
+    frozenset: The valid syllables.
+    """
+    if checker is None:
+        from .checker import Checker
+        checker = Checker(backend='table')
+    lexicon = []
+    for syllable in enumerate_syllables(checker):
+        try:
+            if checker.check_syllable(syllable):
+                lexicon.append(syllable)
+        except KeyError:
+            continue
+    return frozenset(lexicon)
+
+
+def lexicon_mismatches(lexicon, checker):
+    """
+    Compares a lexicon with the rule-based check of a checker over every enumerated syllable,
+    which makes the lexicon an exhaustive regression oracle for the rules.
+
+    Parameters:
+    lexicon (set): Set of valid syllables.
+    checker (Checker): Checker whose check_syllable() is compared, without a lexicon.
+
+    Returns:
+    list: The syllables on which the lexicon and the rules disagree.
+    """
+    mismatches = []
+    for syllable in enumerate_syllables(checker):
+        try:
+            if_true = checker.check_syllable(syllable)
+        except KeyError:
+            if_true = False
+        if if_true != (syllable in lexicon):
+            mismatches.append(syllable)
+    return mismatches
+
+
+def save_lexicon(lexicon, path):
+    """
+    Saves a lexicon as text, one syllable per line after a header with the rule version, gzip
+    compressed if the path ends with '.gz'.
+
+    Parameters:
+    lexicon (set): Set of valid syllables.
+    path (str): Path of the lexicon file.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as file:
+        file.write(LEXICON_HEADER + RULES_VERSION + '\n')
+        for syllable in sorted(lexicon):
+            file.write(syllable + '\n')
+
+
+def load_lexicon(path):
+    """
+    Loads a lexicon saved by save_lexicon().
+
+    Parameters:
+    path (str): Path of the lexicon file.
+
+    Returns:
+    frozenset: The valid syllables.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        header = file.readline().rstrip('\n')
+        if header != LEXICON_HEADER + RULES_VERSION:
+            raise ValueError("\"{}\" is not a lexicon of the current rules, please rebuild it.".format(path))
+        return frozenset(line.rstrip('\n') for line in file)
+
+
+def get_lexicon(path):
+    """
+    Loads a lexicon from a file, building and saving it first if the file does not exist or was
+    built with other rules.
+
+    Parameters:
+    path (str): Path of the lexicon file.
+
+    Returns:
+    frozenset: The valid syllables.
+    """
+    if os.path.isfile(path):
+        try:
+            return load_lexicon(path)
+        except ValueError:
+            pass
+    lexicon = build_lexicon()
+    save_lexicon(lexicon, path)
+    return lexicon
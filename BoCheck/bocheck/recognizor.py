@@ -1,19 +1,220 @@
+import hashlib
 import numpy as np
 import pandas as pd
 import re
 from ..memristor.memristor import memristor
-from ..utils.utils import get_bin_list, get_index, get_bin, short_to_tall
+from ..utils.utils import TIBETAN_CODE_TABLE, get_bin_list, get_index, get_bin, get_id, short_to_tall
 from ..utils.clean import *
 from ..utils.tokenize import *
 from ..letters import *
 
 
+# Syllables whose prefix, root and suffix reading gives way to root, suffix and farther suffix
+THREE_JHZ = ['བགས', 'མབས', 'གགས', 'བངས', 'དངས', 'གངས', 'འངས',
+             'གམས', 'མམས', 'བབས', 'མངས', 'གབས', 'བམས', 'འམམ']
+
+# Syllable structure rules, tried in order for each number of components. A rule applies when
+# every character matches its class and every relation check passes, where a check
+# (relation, key, letter, tall) tests tibetan[letter] (in tall form if `tall`) against
+# tibetan[key] with Recognizer.related(), and ('three_jhz',) requires the syllable not to be one
+# of THREE_JHZ. A rule without components stops the search.
+SYLLABLE_RULES = {
+    1: [
+        (('root_letters',),
+         ('基字',),
+         ()),
+    ],
+    2: [
+        (('superscript_letters', 'root_letters_short'),
+         ('上加字', '基字'),
+         (('superscript_root', 0, 1, True),)),
+        (('root_letters', 'subscript_letters'),
+         ('基字', '下加字'),
+         (('subscript_root', 1, 0, False),)),
+        (('root_letters', 'suffix_letters'),
+         ('基字', '后加字'),
+         ()),
+        (('root_letters', 'vowel'),
+         ('基字', '元音'),
+         ()),
+    ],
+    3: [
+        (('prefix_letters', 'root_letters', 'suffix_letters'),
+         ('前加字', '基字', '后加字'),
+         (('three_jhz',), ('prefix_root', 0, 1, False))),
+        (('prefix_letters', 'root_letters', 'suffix_letters'),
+         ('基字', '后加字', '再后加字'),
+         (('suffix', 2, 1, False),)),
+        (('prefix_letters', 'root_letters', 'suffix_letters'),
+         None,
+         ()),
+        (('root_letters', 'suffix_letters', 'farther_suffix_letters'),
+         ('基字', '后加字', '再后加字'),
+         (('suffix', 2, 1, False),)),
+        (('prefix_letters', 'root_letters', 'vowel'),
+         ('前加字', '基字', '元音'),
+         (('prefix_root', 0, 1, False),)),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short'),
+         ('前加字', '上加字', '基字'),
+         (('prefix_root', 0, 2, True), ('superscript_root', 1, 2, False))),
+        (('prefix_letters', 'root_letters', 'subscript_letters'),
+         ('前加字', '基字', '下加字'),
+         (('prefix_root', 0, 1, False), ('subscript_root', 2, 1, False))),
+        (('superscript_letters', 'root_letters_short', 'vowel'),
+         ('上加字', '基字', '元音'),
+         (('superscript_root', 0, 1, True),)),
+        (('superscript_letters', 'root_letters_short', 'subscript_letters'),
+         ('上加字', '基字', '下加字'),
+         (('superscript_root', 0, 1, True), ('subscript_root', 2, 1, False))),
+        (('superscript_letters', 'root_letters_short', 'suffix_letters'),
+         ('上加字', '基字', '后加字'),
+         (('superscript_root', 0, 1, True),)),
+        (('root_letters', 'subscript_letters', 'vowel'),
+         ('基字', '下加字', '元音'),
+         (('subscript_root', 1, 0, False),)),
+        (('root_letters', 'subscript_letters', 'suffix_letters'),
+         ('基字', '下加字', '后加字'),
+         (('subscript_root', 1, 0, False),)),
+        (('root_letters', 'vowel', 'suffix_letters'),
+         ('基字', '元音', '后加字'),
+         ()),
+        (('root_letters', 'subscript_letters', 'farther_subscript_letters'),
+         ('基字', '下加字', '再下加字'),
+         (('subscript_root', 1, 0, False), ('subscript_root', 2, 0, False))),
+    ],
+    4: [
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'vowel'),
+         ('前加字', '上加字', '基字', '元音'),
+         (('prefix_root', 0, 2, True), ('superscript_root', 1, 2, True))),
+        (('prefix_letters', 'root_letters', 'subscript_letters', 'vowel'),
+         ('前加字', '基字', '下加字', '元音'),
+         (('prefix_root', 0, 1, False), ('subscript_root', 2, 1, False))),
+        (('prefix_letters', 'root_letters', 'vowel', 'suffix_letters'),
+         ('前加字', '基字', '元音', '后加字'),
+         (('prefix_root', 0, 1, False),)),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'subscript_letters'),
+         ('前加字', '上加字', '基字', '下加字'),
+         (('prefix_root', 0, 2, True), ('superscript_root', 1, 2, True), ('subscript_root', 3, 2, False))),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'suffix_letters'),
+         ('前加字', '上加字', '基字', '后加字'),
+         (('prefix_root', 0, 2, True), ('superscript_root', 1, 2, True))),
+        (('prefix_letters', 'root_letters', 'subscript_letters', 'suffix_letters'),
+         ('前加字', '基字', '下加字', '后加字'),
+         (('prefix_root', 0, 1, False), ('subscript_root', 2, 1, False))),
+        (('prefix_letters', 'root_letters', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '基字', '后加字', '再后加字'),
+         (('prefix_root', 0, 1, False), ('suffix', 3, 2, False))),
+        (('superscript_letters', 'root_letters_short', 'subscript_letters', 'vowel'),
+         ('上加字', '基字', '下加字', '元音'),
+         (('superscript_root', 0, 1, True), ('subscript_root', 2, 1, True))),
+        (('superscript_letters', 'root_letters_short', 'vowel', 'suffix_letters'),
+         ('上加字', '基字', '元音', '后加字'),
+         (('superscript_root', 0, 1, True),)),
+        (('superscript_letters', 'root_letters_short', 'subscript_letters', 'suffix_letters'),
+         ('上加字', '基字', '下加字', '后加字'),
+         (('superscript_root', 0, 1, True), ('subscript_root', 2, 1, True))),
+        (('superscript_letters', 'root_letters_short', 'suffix_letters', 'farther_suffix_letters'),
+         ('上加字', '基字', '后加字', '再后加字'),
+         (('superscript_root', 0, 1, True), ('suffix', 3, 2, False))),
+        (('root_letters', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('基字', '元音', '后加字', '再后加字'),
+         (('suffix', 3, 2, False),)),
+        (('root_letters', 'subscript_letters', 'vowel', 'suffix_letters'),
+         ('基字', '下加字', '元音', '后加字'),
+         (('subscript_root', 1, 0, False),)),
+        (('root_letters', 'subscript_letters', 'suffix_letters', 'farther_suffix_letters'),
+         ('基字', '下加字', '后加字', '再后加字'),
+         (('subscript_root', 1, 0, False), ('suffix', 3, 2, False))),
+    ],
+    5: [
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'subscript_letters', 'vowel'),
+         ('前加字', '上加字', '基字', '下加字', '元音'),
+         ()),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'subscript_letters', 'suffix_letters'),
+         ('前加字', '上加字', '基字', '下加字', '后加字'),
+         ()),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'vowel', 'suffix_letters'),
+         ('前加字', '上加字', '基字', '元音', '后加字'),
+         ()),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '上加字', '基字', '后加字', '再后加字'),
+         ()),
+        (('prefix_letters', 'root_letters', 'subscript_letters', 'vowel', 'suffix_letters'),
+         ('前加字', '基字', '下加字', '元音', '后加字'),
+         ()),
+        (('prefix_letters', 'root_letters', 'subscript_letters', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '基字', '下加字', '后加字', '再后加字'),
+         ()),
+        (('prefix_letters', 'root_letters', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '基字', '元音', '后加字', '再后加字'),
+         ()),
+        (('superscript_letters', 'root_letters_short', 'subscript_letters', 'vowel', 'suffix_letters'),
+         ('上加字', '基字', '下加字', '元音', '后加字'),
+         ()),
+        (('superscript_letters', 'root_letters_short', 'subscript_letters', 'suffix_letters', 'farther_suffix_letters'),
+         ('上加字', '基字', '下加字', '后加字', '再后加字'),
+         ()),
+        (('superscript_letters', 'root_letters_short', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('上加字', '基字', '元音', '后加字', '再后加字'),
+         ()),
+        (('root_letters', 'subscript_letters', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('基字', '下加字', '元音', '后加字', '再后加字'),
+         ()),
+    ],
+    6: [
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'subscript_letters', 'vowel', 'suffix_letters'),
+         ('前加字', '上加字', '基字', '下加字', '元音', '后加字'),
+         ()),
+        (('prefix_letters', 'root_letters', 'subscript_letters', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '基字', '下加字', '元音', '后加字', '再后加字'),
+         ()),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '上加字', '基字', '元音', '后加字', '再后加字'),
+         ()),
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'subscript_letters', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '上加字', '基字', '下加字', '后加字', '再后加字'),
+         ()),
+        (('superscript_letters', 'root_letters_short', 'subscript_letters', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('上加字', '基字', '下加字', '元音', '后加字', '再后加字'),
+         ()),
+    ],
+    7: [
+        (('prefix_letters', 'superscript_letters', 'root_letters_short', 'subscript_letters', 'vowel', 'suffix_letters', 'farther_suffix_letters'),
+         ('前加字', '上加字', '基字', '下加字', '元音', '后加字', '再后加字'),
+         ()),
+    ],
+}
+
+# Fingerprint of the letter classes, relation tables and syllable rules; results computed under a
+# different version may differ
+RULES_VERSION = hashlib.sha1(repr((PERFIX_LETTER, ROOT_LETTER, ROOT_LETTER_SHORT, SHORT_TO_TALL,
+                                   SUPERSCRIPT_LETTER, SUBSCRIPT_LETTER, FARTHER_SUBSCRIPT_LETTER,
+                                   SUFFIX_LETTER, FARTHER_SHUFFIX_LETTER, VOWEL, NUMBER,
+                                   PREFIX_ROOT_RELATION, SUPERSCRIPT_ROOT_RELATION,
+                                   SUBSCRIPT_ROOT_RELATION, SUFFIX_RELATION,
+                                   THREE_JHZ, SYLLABLE_RULES)).encode('utf-8')).hexdigest()[:16]
+
+
 class Recognizer:
-    def __init__(self):
+    # Character classes that match() can recognize against
+    candidates = ('prefix_letters', 'superscript_letters', 'root_letters', 'root_letters_short',
+                  'subscript_letters', 'farther_subscript_letters', 'suffix_letters',
+                  'farther_suffix_letters', 'vowel')
+    # Recognition backends: simulated memristor crossbars, or exact lookup tables
+    backends = ('memristor', 'table')
+
+    def __init__(self, backend='memristor'):
         """
         Initializes the Recognizer class by loading different Tibetan script components,
         binary codes, and relationships for recognition.
+
+        Parameters:
+        backend (str): 'memristor' to classify characters by reading simulated crossbar arrays, or
+                       'table' to use exact lookup tables with identical results.
         """
+        if backend not in self.backends:
+            raise ValueError("Invalid backend. Please choose 'memristor' or 'table'.")
+        self.backend = backend
         self.prefix_letters = PERFIX_LETTER
         self.root_letters = ROOT_LETTER
         self.root_letters_short = ROOT_LETTER_SHORT
@@ -32,6 +233,10 @@ class Recognizer:
         self.superscript_root_relation = SUPERSCRIPT_ROOT_RELATION
         self.subscript_root_relation = SUBSCRIPT_ROOT_RELATION
         self.suffix_relation = SUFFIX_RELATION
+        self.relations = {'prefix_root': self.prefix_root_relation,
+                          'superscript_root': self.superscript_root_relation,
+                          'subscript_root': self.subscript_root_relation,
+                          'suffix': self.suffix_relation}
 
         self.mem = memristor()
 
@@ -45,29 +250,146 @@ class Recognizer:
         self.suffix_letters_code = get_bin_list(self.suffix_letters)
         self.farther_suffix_letters_code = get_bin_list(self.farther_suffix_letters)
         self.vowel_code = get_bin_list(self.vowel)
+
+        # Crossbar arrays programmed once per character class, shared read-only by match()
+        self.crossbars = {}
+        for candidate in self.candidates:
+            crossbar_array = self.mem.crossbar()
+            crossbar_array = self.mem.write_array(crossbar_array, getattr(self, candidate + '_code'))
+            crossbar_array.flags.writeable = False
+            self.crossbars[candidate] = crossbar_array
+
+        # All class crossbars side by side, so one read classifies a character against every class
+        self.crossbar_bank = np.hstack([self.crossbars[candidate] for candidate in self.candidates])
+        self.crossbar_bank.flags.writeable = False
+        # Only the columns holding a letter of the class take part in a match, not the empty padding
+        self.crossbar_mask = np.zeros([len(self.candidates), 50], dtype=bool)
+        for i, candidate in enumerate(self.candidates):
+            self.crossbar_mask[i, :len(getattr(self, candidate))] = True
+
+        # Crossbars programmed once per letter list, keyed by the list's letters, for match_ori()
+        self.programmed = {}
+        for candidate in self.candidates:
+            self.programmed[tuple(getattr(self, candidate))] = self.crossbars[candidate]
+
+        # Relation tables compiled once: each related letter list gets a programmed crossbar, and
+        # reading it with every code of the Tibetan block gives the equivalent boolean adjacency
+        # matrix, indexed by [key letter id, letter id]
+        block_code = TIBETAN_CODE_TABLE[:256]
+        self.relation_matrix = {}
+        self.relation_rows = {}
+        for name, relation in self.relations.items():
+            matrix = np.zeros([256, 256], dtype=bool)
+            for key, letters in relation.items():
+                crossbar_array = self.program(letters)
+                result = self.mem.read_array_batch(block_code, crossbar_array)
+                matrix[get_id(key)] = (result[:, :len(letters)] == 0.00064).any(axis=1)
+            matrix.flags.writeable = False
+            self.relation_matrix[name] = matrix
+            self.relation_rows[name] = {key: matrix[get_id(key)] for key in relation}
+
+        # Lookup tables for the 'table' backend: letter -> matched character per class, and the
+        # relation tables as sets
+        self.no_match = {candidate: None for candidate in self.candidates}
+        self.class_map = {}
+        for candidate in self.candidates:
+            for letter in getattr(self, candidate):
+                self.class_map.setdefault(letter, dict(self.no_match))[candidate] = letter
+        self.relation_sets = {}
+        for name, relation in self.relations.items():
+            self.relation_sets[name] = {key: frozenset(letters) for key, letters in relation.items()}
+
+        # Syllable rules with each class turned into a bit of the character class signature, and
+        # the rules that fit each signature seen so far
+        self.candidate_bits = [(candidate, 1 << i) for i, candidate in enumerate(self.candidates)]
+        bits = dict(self.candidate_bits)
+        self.rule_masks = {}
+        for length, rules in SYLLABLE_RULES.items():
+            self.rule_masks[length] = [(tuple(bits[candidate] for candidate in classes), components, checks)
+                                       for classes, components, checks in rules]
+        self.dispatch = {}
+    
+    def program(self, letters):
+        """
+        Returns the crossbar array programmed with a list of letters, writing it only the first time.
+
+        Parameters:
+        letters (list): List of Tibetan letters to store in the crossbar.
+
+        Returns:
+        np.ndarray: The read-only programmed crossbar array.
+        """
+        crossbar_array = self.programmed.get(tuple(letters))
+        if crossbar_array is None:
+            crossbar_array = self.mem.crossbar()
+            crossbar_array = self.mem.write_array(crossbar_array, get_bin_list(letters))
+            crossbar_array.flags.writeable = False
+            self.programmed[tuple(letters)] = crossbar_array
+        return crossbar_array
     
     def match(self, code, candidate):
         """
         Matches binary code for a character to the closest candidate character in a category.
 
         Parameters:
-        code (str): Binary string of the character code.
+        code (np.ndarray): Binary code of the character, as returned by get_bin().
         candidate (str): Character category to match.
 
         Returns:
         character: Matched character or None if no match is found.
         """
-        crossbar_array = self.mem.crossbar()
-        crossbar_array = self.mem.write_array(crossbar_array, eval('self.' + candidate + '_code'))
-        result = self.mem.read_array(code, crossbar_array)
+        result = self.mem.read_array(code, self.crossbars[candidate])
         index = get_index(result, 0.00064)
         
         try:
-            character = eval('self.' + candidate)[index]
+            character = getattr(self, candidate)[index]
         except:
             character = None
         return character
     
+    def classify(self, tibetan_code, batch_size=1024):
+        """
+        Matches the binary codes of several characters against every character class
+        with batched crossbar reads of at most `batch_size` characters each.
+
+        Parameters:
+        tibetan_code (np.ndarray): (N, 8) binary codes of the characters to classify.
+        batch_size (int): Number of characters read at once, which bounds the memory of a read.
+
+        Returns:
+        list: One dictionary per character, mapping each class name to the matched character or None.
+        """
+        tibetan_match = []
+        for start in range(0, len(tibetan_code), batch_size):
+            code = tibetan_code[start:start + batch_size]
+            result = self.mem.read_array_batch(code, self.crossbar_bank)
+            hits = result.reshape(len(code), len(self.candidates), 50) == 0.00064
+            hits &= self.crossbar_mask
+            found = hits.any(axis=2).tolist()
+            index = hits.argmax(axis=2).tolist()
+            for i in range(len(code)):
+                tibetan_match.append({candidate: getattr(self, candidate)[index[i][j]] if found[i][j] else None
+                                      for j, candidate in enumerate(self.candidates)})
+        return tibetan_match
+    
+    def classify_words(self, word_list):
+        """
+        Classifies every character of a list of words, e.g. a whole text, in one call. Each
+        distinct character is classified once.
+
+        Parameters:
+        word_list (list): List of Tibetan syllables.
+
+        Returns:
+        list: For each word, the list of per-character class matches as returned by classify().
+        """
+        if self.backend == 'table':
+            return [[self.class_map.get(letter, self.no_match) for letter in word] for word in word_list]
+        
+        letters = list(dict.fromkeys(''.join(word_list)))
+        letter_match = dict(zip(letters, self.classify(get_bin_list(letters))))
+        return [[letter_match[letter] for letter in word] for word in word_list]
+    
     def match_ori(self, letter, candidate):
         """
         Matches a letter with a candidate character in the Tibetan script based on binary code.
@@ -80,10 +402,7 @@ class Recognizer:
         character: Matched character or None if no match is found.
         """
         letter_code = get_bin(letter)
-        candidate_code = get_bin_list(candidate)
-        crossbar_array = self.mem.crossbar()
-        crossbar_array = self.mem.write_array(crossbar_array, candidate_code)
-        result = self.mem.read_array(letter_code, crossbar_array)
+        result = self.mem.read_array(letter_code, self.program(candidate))
         index = get_index(result, 0.00064)
         
         try:
@@ -92,499 +411,156 @@ class Recognizer:
             character = None
         return character
     
-    def recognize_two_components(self, tibetan, tibetan_code, tibetan_att):
+    def related(self, relation, key, letter):
+        """
+        Checks whether a letter may combine with a key letter under one of the relation tables,
+        with a single lookup in the compiled adjacency matrix.
+
+        Parameters:
+        relation (str): Name of the relation table: 'prefix_root', 'superscript_root',
+                        'subscript_root' or 'suffix'.
+        key (str): The letter keying the table, e.g. the prefix letter for 'prefix_root'.
+        letter (str): The letter to check against the key, e.g. the root letter.
+
+        Returns:
+        bool: True if the combination is valid. Raises KeyError if `key` is not in the table.
+        """
+        if self.backend == 'table':
+            return letter in self.relation_sets[relation][key]
+        letter_id = get_id(letter)
+        return letter_id >= 0 and bool(self.relation_rows[relation][key][letter_id])
+    
+    def recognize_components(self, tibetan, tibetan_match, tibetan_att, length=None):
+        """
+        Recognizes the components of a syllable with the compiled syllable rules. The class
+        signature of the characters, collected in one left-to-right pass, selects the rules whose
+        class sequence fits in a single dispatch lookup; the first of those whose relation checks
+        pass assigns the components.
+
+        Parameters:
+        tibetan (str): The Tibetan letters to recognize.
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
+        tibetan_att (dict): Dictionary to store the recognized components.
+        length (int, optional): Number of components, defaults to the length of `tibetan`.
+
+        Returns:
+        dict: Updated tibetan_att with recognized components.
+        """
+        if length is None:
+            length = len(tibetan)
+        signature = [length]
+        for letter_match in tibetan_match[:length]:
+            mask = 0
+            for candidate, bit in self.candidate_bits:
+                if letter_match[candidate] is not None:
+                    mask |= bit
+            signature.append(mask)
+        signature = tuple(signature)
+        
+        rules = self.dispatch.get(signature)
+        if rules is None:
+            rules = tuple(rule for rule in self.rule_masks[length]
+                          if all(mask & bit for mask, bit in zip(signature[1:], rule[0])))
+            self.dispatch[signature] = rules
+        
+        for _, components, checks in rules:
+            for check in checks:
+                if check[0] == 'three_jhz':
+                    if tibetan in THREE_JHZ:
+                        break
+                else:
+                    relation, key, letter, tall = check
+                    letter = short_to_tall(tibetan[letter]) if tall else tibetan[letter]
+                    if not self.related(relation, tibetan[key], letter):
+                        break
+            else:
+                if components is not None:
+                    for position, component in enumerate(components):
+                        tibetan_att[component] = tibetan[position]
+                break
+        return tibetan_att
+    
+    def recognize_two_components(self, tibetan, tibetan_match, tibetan_att):
         """
         Recognizes two-component Tibetan characters based on different relationships.
 
         Parameters:
         tibetan (list): List of two Tibetan letters to recognize.
-        tibetan_code (list): Binary codes of the Tibetan letters.
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
         tibetan_att (dict): Dictionary to store the recognized components.
 
         Returns:
         dict: Updated tibetan_att with recognized components.
         """
-        if self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]):
-            tibetan_att["上加字"] = self.match(tibetan_code[0], 'superscript_letters')
-            tibetan_att["基字"] = self.match(tibetan_code[1], 'root_letters_short')
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[1]]):
-            tibetan_att["基字"] = self.match(tibetan_code[0], 'root_letters')
-            tibetan_att["下加字"] = self.match(tibetan_code[1], 'subscript_letters')
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'suffix_letters'):
-            tibetan_att["基字"] = self.match(tibetan_code[0], 'root_letters')
-            tibetan_att["后加字"] = self.match(tibetan_code[1], 'suffix_letters')
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'vowel'):
-            tibetan_att["基字"] = self.match(tibetan_code[0], 'root_letters')
-            tibetan_att["元音"] = self.match(tibetan_code[1], 'vowel')
-            
-        else:
-            tibetan_att = tibetan_att
-        return tibetan_att
+        return self.recognize_components(tibetan, tibetan_match, tibetan_att, 2)
     
-    def recognize_three_components(self, tibetan, tibetan_code, tibetan_att):
+    def recognize_three_components(self, tibetan, tibetan_match, tibetan_att):
         """
         Recognizes three-component Tibetan characters based on various rules and relations.
 
         Parameters:
         tibetan (list): List of three Tibetan letters to recognize.
-        tibetan_code (list): Binary codes of the Tibetan letters.
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
         tibetan_att (dict): Dictionary to store the recognized components.
 
         Returns:
         dict: Updated tibetan_att with recognized components.
         """
-        three_jhz = ['བགས', 'མབས', 'གགས', 'བངས', 'དངས', 'གངས', 'འངས',
-                     'གམས', 'མམས', 'བབས', 'མངས', 'གབས', 'བམས', 'འམམ']
-        
-        if self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'suffix_letters'):
-            if tibetan not in three_jhz and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]):
-                tibetan_att["前加字"] = tibetan[0]
-                tibetan_att["基字"] = tibetan[1]
-                tibetan_att["后加字"] = tibetan[2]
-                
-            elif self.match_ori(tibetan[1], self.suffix_relation[tibetan[2]]):
-                tibetan_att["基字"] = tibetan[0]
-                tibetan_att["后加字"] = tibetan[1]
-                tibetan_att["再后加字"] = tibetan[2]
-                
-            else:
-                tibetan_att = tibetan_att
-                
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'suffix_letters') \
-            and self.match(tibetan_code[2], 'farther_suffix_letters') \
-            and self.match_ori(tibetan[1], self.suffix_relation[tibetan[2]]):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["后加字"] = tibetan[1]
-            tibetan_att["再后加字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'vowel') \
-            and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') \
-            and self.match_ori(short_to_tall(tibetan[2]), self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[2], self.superscript_root_relation[tibetan[1]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'subscript_letters') \
-            and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[1], self.subscript_root_relation[tibetan[2]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'vowel') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'subscript_letters') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[1], self.subscript_root_relation[tibetan[2]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'suffix_letters') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match(tibetan_code[2], 'vowel') \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[1]]):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["下加字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match(tibetan_code[2], 'suffix_letters') \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[1]]):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["下加字"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'vowel') \
-            and self.match(tibetan_code[2], 'suffix_letters'):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["元音"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match(tibetan_code[2], 'farther_subscript_letters') \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[1]]) \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[2]]):
-            tibetan_att['基字'] = tibetan[0]
-            tibetan_att['下加字'] = tibetan[1]
-            tibetan_att['再下加字'] = tibetan[2]
-            
-        else:
-            tibetan_att = tibetan_att
-        return tibetan_att
+        return self.recognize_components(tibetan, tibetan_match, tibetan_att, 3)
     
-    def recognize_four_components(self, tibetan, tibetan_code, tibetan_att):
+    def recognize_four_components(self, tibetan, tibetan_match, tibetan_att):
         """
         Recognizes Tibetan words with four components (prefix, superscript, root, vowel or suffix).
         
         Parameters:
         tibetan (list): A list of Tibetan characters in the word.
-        tibetan_code (list): A list of classifications for each Tibetan character (e.g., 'prefix_letters', 'root_letters', etc.).
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
         tibetan_att (dict): A dictionary that will hold the recognized components of the Tibetan word.
         
         Returns:
         dict: Updated `tibetan_att` with recognized Tibetan components (prefix, superscript, root, etc.) or remains unchanged.
         """
-        if self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'vowel') \
-            and self.match_ori(short_to_tall(tibetan[2]), self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(short_to_tall(tibetan[2]), self.superscript_root_relation[tibetan[1]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'vowel') \
-            and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[1], self.subscript_root_relation[tibetan[2]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'vowel') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'subscript_letters') \
-            and self.match_ori(short_to_tall(tibetan[2]), self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(short_to_tall(tibetan[2]), self.superscript_root_relation[tibetan[1]]) \
-            and self.match_ori(tibetan[2], self.subscript_root_relation[tibetan[3]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["下加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match_ori(short_to_tall(tibetan[2]), self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(short_to_tall(tibetan[2]), self.superscript_root_relation[tibetan[1]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[1], self.subscript_root_relation[tibetan[2]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'suffix_letters') and self.match(tibetan_code[3], 'farther_suffix_letters') \
-            and self.match_ori(tibetan[1], self.prefix_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[2], self.suffix_relation[tibetan[3]]):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            tibetan_att["再后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'vowel') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]) \
-            and self.match_ori(short_to_tall(tibetan[1]), self.subscript_root_relation[tibetan[2]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'vowel') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]) \
-            and self.match_ori(short_to_tall(tibetan[1]), self.subscript_root_relation[tibetan[2]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'suffix_letters') and self.match(tibetan_code[3], 'farther_suffix_letters') \
-            and self.match_ori(short_to_tall(tibetan[1]), self.superscript_root_relation[tibetan[0]]) \
-            and self.match_ori(tibetan[2], self.suffix_relation[tibetan[3]]):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            tibetan_att["再后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'vowel') \
-            and self.match(tibetan_code[2], 'suffix_letters') and self.match(tibetan_code[3], 'farther_suffix_letters') \
-            and self.match_ori(tibetan[2], self.suffix_relation[tibetan[3]]):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["元音"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            tibetan_att["再后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match(tibetan_code[2], 'vowel') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[1]]):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["下加字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match(tibetan_code[2], 'suffix_letters') and self.match(tibetan_code[3], 'farther_suffix_letters') \
-            and self.match_ori(tibetan[0], self.subscript_root_relation[tibetan[1]]) \
-            and self.match_ori(tibetan[2], self.suffix_relation[tibetan[3]]):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["下加字"] = tibetan[1]
-            tibetan_att["后加字"] = tibetan[2]
-            tibetan_att["再后加字"] = tibetan[3]
-            
-        else:
-            tibetan_att = tibetan_att
-        return tibetan_att
+        return self.recognize_components(tibetan, tibetan_match, tibetan_att, 4)
     
-    def recognize_five_components(self, tibetan, tibetan_code, tibetan_att):
+    def recognize_five_components(self, tibetan, tibetan_match, tibetan_att):
         """
         Recognizes Tibetan words with five components (prefix, superscript, root, subscript, vowel or suffix).
         
         Parameters:
         tibetan (list): A list of Tibetan characters in the word.
-        tibetan_code (list): A list of classifications for each Tibetan character (e.g., 'prefix_letters', 'root_letters', etc.).
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
         tibetan_att (dict): A dictionary that will hold the recognized components of the Tibetan word.
         
         Returns:
         dict: Updated `tibetan_att` with recognized Tibetan components (prefix, superscript, root, subscript, etc.) or remains unchanged.
         """
-        if self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'subscript_letters') \
-            and self.match(tibetan_code[4], 'vowel'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["下加字"] = tibetan[3]
-            tibetan_att["元音"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'subscript_letters') \
-            and self.match(tibetan_code[4], 'suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["下加字"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'vowel') \
-            and self.match(tibetan_code[4], 'suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match(tibetan_code[4], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            tibetan_att["再后加字"] = tibetan[4]
-                
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'vowel') \
-            and self.match(tibetan_code[4], 'suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match(tibetan_code[4], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            tibetan_att["再后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'vowel') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match(tibetan_code[4], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            tibetan_att["再后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'vowel') \
-            and self.match(tibetan_code[4], 'suffix_letters'):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match(tibetan_code[4], 'farther_suffix_letters'):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            tibetan_att["再后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'vowel') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match(tibetan_code[4], 'farther_suffix_letters'):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            tibetan_att["再后加字"] = tibetan[4]
-            
-        elif self.match(tibetan_code[0], 'root_letters') and self.match(tibetan_code[1], 'subscript_letters') \
-            and self.match(tibetan_code[2], 'vowel') and self.match(tibetan_code[3], 'suffix_letters') \
-            and self.match(tibetan_code[4], 'farther_suffix_letters'):
-            tibetan_att["基字"] = tibetan[0]
-            tibetan_att["下加字"] = tibetan[1]
-            tibetan_att["元音"] = tibetan[2]
-            tibetan_att["后加字"] = tibetan[3]
-            tibetan_att["再后加字"] = tibetan[4]
-            
-        else:
-            tibetan_att = tibetan_att
-        return tibetan_att
+        return self.recognize_components(tibetan, tibetan_match, tibetan_att, 5)
     
-    def recognize_six_components(self, tibetan, tibetan_code, tibetan_att):
+    def recognize_six_components(self, tibetan, tibetan_match, tibetan_att):
         """
         Recognizes a Tibetan word composed of six components and updates tibetan_att accordingly.
 
         Parameters:
         tibetan (list): A list of Tibetan characters representing a word.
-        tibetan_code (list): A list of codes representing the types of the corresponding Tibetan characters.
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
         tibetan_att (dict): A dictionary to store recognized components of the word, e.g., prefix, root letter, etc.
 
         Returns:
         dict: Updated tibetan_att with recognized components, such as 前加字 (prefix), 上加字 (superscript), 基字 (root letter),
         元音 (vowel), 后加字 (suffix), 下加字 (subscript), 再后加字 (farther suffix), depending on the word structure.
         """
-        if self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'subscript_letters') \
-            and self.match(tibetan_code[4], 'vowel') and self.match(tibetan_code[5], 'suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["下加字"] = tibetan[3]
-            tibetan_att["元音"] = tibetan[4]
-            tibetan_att["后加字"] = tibetan[5]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'root_letters') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'vowel') \
-            and self.match(tibetan_code[4], 'suffix_letters') and self.match(tibetan_code[5], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            tibetan_att["再后加字"] = tibetan[5]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'vowel') \
-            and self.match(tibetan_code[4], 'suffix_letters') and self.match(tibetan_code[5], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            tibetan_att["再后加字"] = tibetan[5]
-            
-        elif self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'subscript_letters') \
-            and self.match(tibetan_code[4], 'suffix_letters') and self.match(tibetan_code[5], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["下加字"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            tibetan_att["再后加字"] = tibetan[5]
-            
-        elif self.match(tibetan_code[0], 'superscript_letters') and self.match(tibetan_code[1], 'root_letters_short') \
-            and self.match(tibetan_code[2], 'subscript_letters') and self.match(tibetan_code[3], 'vowel') \
-            and self.match(tibetan_code[4], 'suffix_letters') and self.match(tibetan_code[5], 'farther_suffix_letters'):
-            tibetan_att["上加字"] = tibetan[0]
-            tibetan_att["基字"] = tibetan[1]
-            tibetan_att["下加字"] = tibetan[2]
-            tibetan_att["元音"] = tibetan[3]
-            tibetan_att["后加字"] = tibetan[4]
-            tibetan_att["再后加字"] = tibetan[5]
-            
-        else:
-            tibetan_att = tibetan_att
-        return tibetan_att
+        return self.recognize_components(tibetan, tibetan_match, tibetan_att, 6)
     
-    def recognize_seven_components(self, tibetan, tibetan_code, tibetan_att):
+    def recognize_seven_components(self, tibetan, tibetan_match, tibetan_att):
         """
         Recognizes a Tibetan word composed of seven components and updates tibetan_att accordingly.
 
         Parameters:
         tibetan (list): A list of Tibetan characters representing a word.
-        tibetan_code (list): A list of codes representing the types of the corresponding Tibetan characters.
+        tibetan_match (list): Class matches of the Tibetan letters, as returned by classify().
         tibetan_att (dict): A dictionary to store recognized components of the word, e.g., prefix, root letter, etc.
 
         Returns:
         dict: Updated tibetan_att with recognized components.
         """
-        if self.match(tibetan_code[0], 'prefix_letters') and self.match(tibetan_code[1], 'superscript_letters') \
-            and self.match(tibetan_code[2], 'root_letters_short') and self.match(tibetan_code[3], 'subscript_letters') \
-            and self.match(tibetan_code[4], 'vowel') and self.match(tibetan_code[5], 'suffix_letters') \
-            and self.match(tibetan_code[6], 'farther_suffix_letters'):
-            tibetan_att["前加字"] = tibetan[0]
-            tibetan_att["上加字"] = tibetan[1]
-            tibetan_att["基字"] = tibetan[2]
-            tibetan_att["下加字"] = tibetan[3]
-            tibetan_att["元音"] = tibetan[4]
-            tibetan_att["后加字"] = tibetan[5]
-            tibetan_att["再后加字"] = tibetan[6]
-            
-        else:
-            tibetan_att = tibetan_att
-        return tibetan_att
\ No newline at end of file
+        return self.recognize_components(tibetan, tibetan_match, tibetan_att, 7)
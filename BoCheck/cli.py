@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import sys
+from .bocheck.checker import Checker, CHECK_COLUMN
+from .utils.sink import open_sink, JsonlSink, CsvSink, ParquetSink
+from .load import stream_file, iter_files, iter_members, is_file, parse_shard, get_shard, ARCHIVES
+from .process import iter_process_files, analyze_file_shards, merge_tables
+
+
+# Results given by each subcommand: (component_recognization, spelling_check)
+COMMANDS = {
+    'check': (False, True),
+    'recognize': (True, False),
+    'analyze': (True, True),
+}
+# Sink of each output format, and name standing for stdin and stdout
+FORMATS = {'ndjson': JsonlSink, 'csv': CsvSink, 'parquet': ParquetSink}
+STDIO = '-'
+
+
+def get_parser():
+    """
+    Builds the parser of the command line arguments.
+
+    Returns:
+    argparse.ArgumentParser: Parser of the `bocheck` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog='bocheck', description="Tibetan syllable component recognition and spelling check.")
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+    for command, description in (('check', "check the spelling of each syllable"),
+                                 ('recognize', "recognize the components of each syllable"),
+                                 ('analyze', "recognize the components and check the spelling of each syllable")):
+        subparser = subparsers.add_parser(command, help=description, description=description)
+        subparser.add_argument('inputs', nargs='*', default=[STDIO], metavar='input',
+                               help=".txt or .docx files, possibly compressed or in archives "
+                                    "(archive!member), archives, folders, or - for stdin (default)")
+        subparser.add_argument('-o', '--output', default=STDIO,
+                               help="output file, written once complete, or - for stdout (default)")
+        subparser.add_argument('-f', '--format', choices=FORMATS,
+                               help="output format, from the output file extension by default, ndjson on stdout")
+        subparser.add_argument('-w', '--workers', type=int, default=1,
+                               help="number of worker processes (default: 1)")
+        subparser.add_argument('-e', '--errors-only', action='store_true',
+                               help="only output the misspelled syllables")
+        subparser.add_argument('--cache-size', type=int,
+                               help="number of distinct syllables kept in the cache of each worker")
+        subparser.add_argument('--offsets', action='store_true',
+                               help="output the start and end offsets of each syllable")
+        subparser.add_argument('--batch-size', type=int, default=4096,
+                               help="number of syllables analyzed and written at a time (default: 4096)")
+        subparser.add_argument('--include', action='append',
+                               help="pattern of the files to analyze in folders and archives, may be repeated")
+        subparser.add_argument('--exclude', action='append',
+                               help="pattern of the files and subfolders to skip in folders and archives, "
+                                    "may be repeated")
+        subparser.add_argument('--no-recursive', action='store_true', help="do not go into subfolders")
+        subparser.add_argument('--shard', metavar='i/N',
+                               help="only analyze the i-th of N shards of the files, chosen by a hash of "
+                                    "their path, e.g. to split a corpus across machines")
+    description = "merge the outputs of the shards of a corpus and summarize them"
+    subparser = subparsers.add_parser('merge', help=description, description=description)
+    subparser.add_argument('tables', nargs='+', metavar='table',
+                           help=".csv, .jsonl or .ndjson (optionally .gz) or .parquet outputs to merge")
+    subparser.add_argument('-o', '--output', default=STDIO,
+                           help="merged output file, written once complete, or - for stdout (default)")
+    subparser.add_argument('-f', '--format', choices=FORMATS,
+                           help="output format, from the output file extension by default, ndjson on stdout")
+    subparser.add_argument('--summary', default=STDIO,
+                           help="JSON file of the summary statistics, or - for stderr (default)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs the `bocheck` command, writing the results of the inputs to the output as they come.
+
+    Parameters:
+    argv (list, optional): Command line arguments, sys.argv[1:] if None.
+
+    Returns:
+    int: Exit status, 0 on success, 1 if stdout was closed early and 2 on invalid arguments.
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'merge':
+        return merge(args)
+    if args.workers < 1:
+        parser.error("argument -w/--workers: must be a positive integer")
+    if args.batch_size < 1:
+        parser.error("argument --batch-size: must be a positive integer")
+    try:
+        if args.shard is not None:
+            args.shard = parse_shard(args.shard)
+        with open_output(args.output, args.format) as sink:
+            for name, result in iter_results(args):
+                if name is None:
+                    sink.write(result)
+                else:
+                    sink.write(result, name)
+    except BrokenPipeError:
+        silence_stdout()
+        return 1
+    except ValueError as error:
+        print("bocheck: error: {}".format(error), file=sys.stderr)
+        return 2
+    return 0
+
+
+def merge(args):
+    """
+    Runs the `bocheck merge` command, writing the merged table and then the summary statistics.
+
+    Parameters:
+    args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+    int: Exit status, as returned by main().
+    """
+    try:
+        with open_output(args.output, args.format) as sink:
+            summary = merge_tables(args.tables, sink)
+    except BrokenPipeError:
+        silence_stdout()
+        return 1
+    except ValueError as error:
+        print("bocheck: error: {}".format(error), file=sys.stderr)
+        return 2
+    if args.summary == STDIO:
+        print(json.dumps(summary, indent=1), file=sys.stderr)
+    else:
+        with open(args.summary, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, indent=1)
+            file.write('\n')
+    return 0
+
+
+def silence_stdout():
+    """
+    Sends what is left to write to stdout to the null device once its reader stopped early, e.g.
+    `bocheck check corpus | head`, so that flushing it at exit does not fail again.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+
+def open_output(output, output_format=None):
+    """
+    Opens the sink the results are written to.
+
+    Parameters:
+    output (str): Path of the output file, or - for stdout.
+    output_format (str, optional): 'ndjson', 'csv' or 'parquet', from the extension of the
+                                   output file if None, or ndjson on stdout.
+
+    Returns:
+    JsonlSink, CsvSink, ParquetSink or ExcelSink: The opened sink.
+    """
+    if output != STDIO:
+        return FORMATS[output_format](output) if output_format is not None else open_sink(output)
+    if output_format == 'parquet':
+        sys.stdout.flush()
+        return ParquetSink(sys.stdout.buffer)
+    # Tibetan text is written as UTF-8 whatever the locale, without newline translation
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8', newline='')
+    return FORMATS[output_format or 'ndjson'](sys.stdout)
+
+
+def iter_inputs(args):
+    """
+    Lists the inputs lazily, with the files of each folder as they are found.
+
+    The files of a folder are named by their path relative to the folder, as by process_dir(), so
+    that a corpus gives the same names wherever it is mounted, e.g. on each machine analyzing a
+    shard of it; a file given by itself is named by its path as given. An archive given by itself
+    is looked into like a folder, its members being named and selected as in the folder holding it,
+    e.g. "corpus.zip!a.txt".
+
+    Parameters:
+    args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+    Iterator[tuple]: (file_path, name) of each file, with the "archive!member" name of each
+                     member as its path, or (-, -) for stdin.
+    """
+    for name in args.inputs:
+        if name == STDIO:
+            yield name, name
+        elif os.path.isdir(name):
+            for file_path in iter_files(name, args.include, args.exclude, recursive=not args.no_recursive,
+                                        shard=args.shard):
+                yield file_path, os.path.relpath(file_path, name)
+        elif os.path.isfile(name) and name.endswith(ARCHIVES):
+            for file_path in iter_members(name, args.include, args.exclude, shard=args.shard):
+                yield file_path, os.path.basename(name) + file_path[len(name):]
+        elif is_file(name):
+            # A file given by itself is sharded by its path as given
+            if args.shard is None or get_shard(name.replace(os.sep, '/'), args.shard[1]) == args.shard[0]:
+                yield name, name
+        else:
+            raise ValueError("\"{}\" is not a file or a folder, please input a file or folder path.".format(name))
+
+
+def iter_results(args):
+    """
+    Analyzes the inputs, with one Checker in this process, streaming each file batch by batch,
+    or in worker processes, file by file or, for a single file, shard by shard.
+
+    Parameters:
+    args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+    Iterator[tuple]: (name, result) for each batch of results, the name of the input being None
+                     when stdin is the only input, and the result being filtered and as returned
+                     by Checker.analyze().
+    """
+    component_recognization, spelling_check = COMMANDS[args.command]
+    options = (component_recognization, spelling_check or args.errors_only, args.offsets)
+    named = args.inputs != [STDIO]
+
+    def select(result):
+        if args.errors_only:
+            result = result[~result[CHECK_COLUMN].astype(bool)]
+            if not spelling_check:
+                result = result.drop(columns=CHECK_COLUMN)
+        return result.reset_index(drop=True)
+
+    if args.workers > 1:
+        inputs = list(iter_inputs(args))
+        names = dict(inputs)
+        if STDIO not in names and len(inputs) == 1:
+            file_path, name = inputs[0]
+            yield (name if named else None,
+                   select(analyze_file_shards(file_path, *options, args.workers, args.cache_size)))
+            return
+        for file_path, result in iter_process_files([file_path for file_path, _ in inputs if file_path != STDIO],
+                                                    *options, args.workers, args.cache_size):
+            yield names[file_path], select(result)
+        if STDIO not in names:
+            return
+        inputs = [(STDIO, STDIO)]
+    else:
+        inputs = iter_inputs(args)
+
+    checker = Checker(cache_size=args.cache_size)
+    for file_path, name in inputs:
+        if file_path == STDIO:
+            if hasattr(sys.stdin, 'reconfigure'):
+                sys.stdin.reconfigure(encoding='utf-8')
+            # Lines are analyzed as they come, so that the command can sit in a pipeline
+            stream = iter(sys.stdin.readline, '')
+        else:
+            stream = stream_file(file_path)
+        for batch in checker.iter_analyze(stream, options[0], options[1], args.batch_size, args.offsets):
+            yield name if named else None, select(batch)
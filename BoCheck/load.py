@@ -1,12 +1,37 @@
+import atexit
+import bz2
+import calendar
+import collections
+import contextlib
+import fnmatch
+import gzip
+import hashlib
+import io
+import lzma
 import os
-from .utils.file import read_txt, read_docx, get_file_extension
+import tarfile
+import zipfile
+from .utils.file import read_txt, iter_txt_mmap, read_docx, iter_docx, get_file_extension
+
+
+# Extensions of the files that can be loaded
+EXTENSIONS = ('.txt', '.docx')
+# Extensions of compressed files, opened with the stdlib module of their compression, e.g. "a.txt.gz"
+COMPRESSIONS = {'.gz': gzip.open, '.xz': lzma.open, '.bz2': bz2.open}
+# Extensions of archives, of which each member is loaded as a file named "archive!member"
+ARCHIVES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2')
+MEMBER_SEPARATOR = '!'
+# Number of archives kept open by open_archive() in each process
+ARCHIVE_CACHE_SIZE = 8
 
 
 def load_file(file_path):
     if type(file_path) != str:
         raise ValueError("\"{}\" is not a file, lease input a file path or file path.")
-    if not os.path.isfile(file_path):  
+    if not is_file(file_path):  
         raise ValueError("\"{}\" is not a file, lease input a file path or file path.")
+    if not os.path.isfile(file_path) or file_path.endswith(tuple(COMPRESSIONS)):
+        return ''.join(stream_file(file_path))
     file_format = get_file_extension(file_path)
     if file_format == '.txt':
         text = read_txt(file_path)
@@ -17,19 +42,432 @@ def load_file(file_path):
     return text
 
 
+def read_file(file_path):
+    """
+    Loads a file as load_file() does, along with the SHA-1 hash of its content, hashed from the
+    bytes the text is decoded from so that the file is only read once.
+
+    Parameters:
+    file_path (str): Path of a .txt or .docx file, possibly compressed, or "archive!member" name
+                     of a member of an archive.
+
+    Returns:
+    tuple: (text, file_hash), the text of the file and the hex digest of its decompressed content.
+    """
+    if type(file_path) != str:
+        raise ValueError("\"{}\" is not a file, lease input a file path or file path.".format(file_path))
+    if not is_file(file_path):  
+        raise ValueError("\"{}\" is not a file, lease input a file path or file path.".format(file_path))
+    file_format = os.path.splitext(get_document_name(file_path))[1]
+    if file_format not in EXTENSIONS:
+        raise ValueError("Invalid file format. Please choose .txt or .docx file.")
+    with open_file(file_path) as file:
+        data = file.read()
+    if file_format == '.docx':
+        text = '\n'.join(iter_docx(io.BytesIO(data)))
+    else:
+        # Line endings are translated as by read_txt()
+        text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()
+    return text, hashlib.sha1(data).hexdigest()
+
+
+def stream_file(file_path, chunk_size=1 << 20):
+    """
+    Loads a file lazily as an iterator of text chunks, for iter_syllables_stream() and
+    Checker.iter_analyze(). A .txt file is read through a memory map, chunk by chunk, and a .docx
+    file paragraph by paragraph. Compressed files and members of archives are decompressed as
+    they are read, without being written to disk.
+
+    Parameters:
+    file_path (str): Path of a .txt or .docx file, possibly compressed (e.g. "a.txt.gz"), or of a
+                     member of an archive (e.g. "corpus.zip!a/b.txt").
+    chunk_size (int): Number of bytes decoded at a time from a .txt file, or of characters from a
+                      compressed one.
+
+    Returns:
+    Iterator[str]: The text of the file, chunk by chunk.
+    """
+    if type(file_path) != str:
+        raise ValueError("\"{}\" is not a file, lease input a file path or file path.".format(file_path))
+    if not is_file(file_path):  
+        raise ValueError("\"{}\" is not a file, lease input a file path or file path.".format(file_path))
+    file_format = os.path.splitext(get_document_name(file_path))[1]
+    if file_format not in EXTENSIONS:
+        raise ValueError("Invalid file format. Please choose .txt or .docx file.")
+    if not os.path.isfile(file_path) or file_path.endswith(tuple(COMPRESSIONS)):
+        return iter_compressed(file_path, chunk_size)
+    elif file_format == '.txt':
+        return iter_txt_mmap(file_path, chunk_size=chunk_size)
+    else:
+        return join_paragraphs(iter_docx(file_path))
+
+
+def iter_compressed(file_path, chunk_size=1 << 20):
+    """
+    Reads a compressed file or a member of an archive lazily, as stream_file() does.
+
+    Parameters:
+    file_path (str): Path of the compressed file or "archive!member" name of the member.
+    chunk_size (int): Number of characters in each chunk of a .txt file.
+
+    Returns:
+    Iterator[str]: The text of the file, chunk by chunk.
+    """
+    with open_file(file_path) as file:
+        if get_document_name(file_path).endswith('.docx'):
+            yield from join_paragraphs(iter_docx(file))
+        else:
+            # Line endings are translated as by read_txt()
+            text = io.TextIOWrapper(file, encoding='utf-8')
+            try:
+                yield from iter(lambda: text.read(chunk_size), '')
+            finally:
+                # The file is closed by open_file()
+                text.detach()
+
+
+def join_paragraphs(paragraphs):
+    """
+    Puts the paragraphs of a .docx file back together lazily, one line per paragraph.
+    """
+    return ('\n' + paragraph if i else paragraph for i, paragraph in enumerate(paragraphs))
+
+
+@contextlib.contextmanager
+def open_file(file_path):
+    """
+    Opens a file, a compressed file or a member of an archive for reading in binary mode,
+    decompressing it as it is read.
+
+    Parameters:
+    file_path (str): Path of the file, or "archive!member" name of the member.
+
+    Returns:
+    ContextManager[file]: The opened file, closed on exit; an archive stays open for its next members.
+    """
+    archive_path, member = split_member(file_path)
+    with contextlib.ExitStack() as stack:
+        if member is None:
+            file = stack.enter_context(open(file_path, 'rb'))
+        else:
+            archive, members = open_archive(archive_path)
+            if member not in members:
+                raise ValueError("\"{}\" is not a file, lease input a file path or file path.".format(file_path))
+            if archive_path.endswith('.zip'):
+                file = stack.enter_context(archive.open(members[member]))
+            else:
+                file = stack.enter_context(archive.extractfile(members[member]))
+        extension = os.path.splitext(member if member is not None else file_path)[1]
+        if extension in COMPRESSIONS:
+            file = stack.enter_context(COMPRESSIONS[extension](file))
+        yield file
+
+
+def split_member(file_path):
+    """
+    Splits the "archive!member" name of a member of an archive.
+
+    Parameters:
+    file_path (str): Path of a file, or "archive!member" name of a member.
+
+    Returns:
+    tuple: (archive_path, member), or (file_path, None) for a file outside an archive.
+    """
+    position = file_path.find(MEMBER_SEPARATOR)
+    # A separator may also be part of a file name, the archive is the first existing one
+    while position != -1:
+        archive_path = file_path[:position]
+        if archive_path.endswith(ARCHIVES) and os.path.isfile(archive_path):
+            return archive_path, file_path[position + 1:]
+        position = file_path.find(MEMBER_SEPARATOR, position + 1)
+    return file_path, None
+
+
+def is_file(file_path):
+    """
+    Tells whether a path is a file or the "archive!member" name of a member of an archive.
+    """
+    return os.path.isfile(file_path) or split_member(file_path)[1] is not None
+
+
+def get_document_name(file_path):
+    """
+    Gives the name of the document of a file or a member, without its compression extension,
+    e.g. "b.txt" for "corpus.zip!a/b.txt.gz".
+    """
+    name, extension = os.path.splitext(split_member(file_path)[1] or file_path)
+    return name if extension in COMPRESSIONS else name + extension
+
+
+def get_file_stat(file_path):
+    """
+    Gives the size and modification time (in ns) of a file, or those recorded in its archive for
+    a member, which only change with the member itself.
+    """
+    archive_path, member = split_member(file_path)
+    if member is None:
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+    info = open_archive(archive_path)[1][member]
+    if archive_path.endswith('.zip'):
+        return info.file_size, calendar.timegm(info.date_time + (0, 0, 0)) * 10 ** 9
+    return info.size, int(info.mtime) * 10 ** 9
+
+
+def get_file_size(file_path):
+    """
+    Gives the size of a file on disk, or the uncompressed size of a member of an archive.
+    """
+    archive_path, member = split_member(file_path)
+    if member is None:
+        return os.path.getsize(file_path)
+    info = open_archive(archive_path)[1][member]
+    return info.file_size if archive_path.endswith('.zip') else info.size
+
+
 def load_dir(dir_path):
+    """
+    Loads every .txt and .docx file of a folder and its subfolders, compressed or not, and
+    those in archives.
+
+    Parameters:
+    dir_path (str): Path of the folder.
+
+    Returns:
+    dict: Text of each file, by file path ("archive!member" name for a member of an archive).
+    """
+    return dict(iter_dir(dir_path))
+
+
+def iter_dir(dir_path, include=None, exclude=None, extensions=EXTENSIONS, recursive=True, stream=False,
+             archives=True, shard=None):
+    """
+    Loads the files of a folder lazily, one at a time, as they are found.
+
+    Parameters:
+    dir_path (str): Path of the folder.
+    include, exclude, extensions, recursive, archives, shard: File selection, as in iter_files().
+    stream (bool): If True, each file is given as an iterator of text chunks from stream_file()
+                   instead of its whole text.
+
+    Returns:
+    Iterator[tuple]: (file_path, text) for each selected file.
+    """
+    for file_path in iter_files(dir_path, include, exclude, extensions, recursive, archives, shard):
+        yield file_path, stream_file(file_path) if stream else load_file(file_path)
+
+
+def iter_files(dir_path, include=None, exclude=None, extensions=EXTENSIONS, recursive=True, archives=True,
+               shard=None):
+    """
+    Finds the files of a folder with os.scandir, in name order, going into subfolders as they come.
+
+    Patterns are shell-style globs matched against the path relative to the folder, with '/'
+    separators ('*' also matching '/'), or against the file name alone for patterns without '/'.
+    Subfolders matching an exclude pattern are skipped entirely.
+
+    Compressed files are selected by the extension of the file they hold, e.g. "a.txt.gz" as a
+    .txt file. Archives are looked into, and their members are selected like files, with
+    "archive!member" relative paths, e.g. "corpus.zip!a/b.txt", in their order in the archive so
+    that loading them in turn reads a compressed archive once.
+
+    With a shard "i/N", only the files of the i-th of N shards are found, the shard of each file
+    being given by a hash of its relative path, so that N runs over the same folder, e.g. on N
+    machines, each find a different part of its files and together find all of them.
+
+    Parameters:
+    dir_path (str): Path of the folder.
+    include (list, optional): Patterns of which a file must match one, all files if None.
+    exclude (list, optional): Patterns of the files and subfolders to skip.
+    extensions (tuple, optional): File extensions to keep, all files if None.
+    recursive (bool): If True, files in subfolders are found too.
+    archives (bool): If True, the members of archives are found too.
+    shard (str or tuple, optional): Shard "i/N" or (i, N), 1 <= i <= N, of the files to find.
+
+    Returns:
+    Iterator[str]: Path of each selected file, "archive!member" name of each selected member.
+    """
     if type(dir_path) != str:
         raise ValueError("\"{}\" is not a folder, lease input a folder path or folder path.".format(dir_path))
     if not os.path.isdir(dir_path):  
         raise ValueError("\"{}\" is not a folder, lease input a folder path or folder path.".format(dir_path))
+    if isinstance(include, str):
+        include = [include]
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    if shard is not None:
+        shard = parse_shard(shard)
     
-    files = []
-    for filename in os.listdir(dir_path):
-        file_path = os.path.join(dir_path, filename)
-        files.append(file_path)
+    def scan(path, prefix):
+        with os.scandir(path) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        for entry in entries:
+            relative_path = prefix + entry.name
+            if exclude and match_patterns(relative_path, exclude):
+                continue
+            if entry.is_dir():
+                if recursive:
+                    yield from scan(entry.path, relative_path + '/')
+            elif entry.is_file():
+                if archives and entry.name.endswith(ARCHIVES):
+                    yield from iter_members(entry.path, include, exclude, extensions, shard, relative_path)
+                elif is_selected(relative_path, include, extensions, shard):
+                    yield entry.path
     
-    texts = {}
-    for file_path in files:
-        text = load_file(file_path)
-        texts[file_path] = text
-    return texts
\ No newline at end of file
+    yield from scan(dir_path, '')
+
+
+def iter_members(archive_path, include=None, exclude=None, extensions=EXTENSIONS, shard=None, relative_path=None):
+    """
+    Finds the members of an archive in their order in it, selected as iter_files() selects the
+    files of a folder. Patterns and shards apply to "relative_path!member" paths.
+
+    Parameters:
+    archive_path (str): Path of a .zip or .tar archive, possibly compressed.
+    include, exclude, extensions, shard: File selection, as in iter_files().
+    relative_path (str, optional): Path of the archive relative to its folder, its file name if
+                                   None, as when iter_files() finds it in its folder.
+
+    Returns:
+    Iterator[str]: "archive!member" name of each selected member.
+    """
+    if not (isinstance(archive_path, str) and archive_path.endswith(ARCHIVES) and os.path.isfile(archive_path)):
+        raise ValueError("\"{}\" is not an archive, please input a .zip or .tar archive path.".format(archive_path))
+    if isinstance(include, str):
+        include = [include]
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    if shard is not None:
+        shard = parse_shard(shard)
+    if relative_path is None:
+        relative_path = os.path.basename(archive_path)
+    for member in list_members(archive_path):
+        member_path = relative_path + MEMBER_SEPARATOR + member
+        if exclude and match_patterns(member_path, exclude):
+            continue
+        if is_selected(member_path, include, extensions, shard):
+            yield archive_path + MEMBER_SEPARATOR + member
+
+
+def match_patterns(relative_path, patterns):
+    """
+    Tells whether a relative path matches one of the patterns of iter_files().
+    """
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatchcase(relative_path if '/' in pattern else name, pattern) for pattern in patterns)
+
+
+def is_selected(relative_path, include=None, extensions=EXTENSIONS, shard=None):
+    """
+    Tells whether a file is selected by the extensions, include patterns and shard (i, N) of
+    iter_files(), from its relative path.
+    """
+    if extensions is not None and not get_document_name(relative_path).endswith(tuple(extensions)):
+        return False
+    if include and not match_patterns(relative_path, include):
+        return False
+    return shard is None or get_shard(relative_path, shard[1]) == shard[0]
+
+
+def list_members(archive_path):
+    """
+    Lists the files of an archive, in their order in the archive.
+
+    Parameters:
+    archive_path (str): Path of a .zip or .tar archive, possibly compressed.
+
+    Returns:
+    list: Names of the members of the archive that are files.
+    """
+    return list(open_archive(archive_path)[1])
+
+
+# Archives opened by open_archive(), from the least to the most recently used, by path:
+# ((size, mtime), archive, members)
+archive_cache = collections.OrderedDict()
+
+
+def open_archive(archive_path):
+    """
+    Opens an archive and indexes its members, keeping it open for the next members read from it,
+    so that an archive is opened and scanned once rather than once per member. An archive that
+    changed on disk since is opened again.
+
+    Members of a compressed tar archive can only be read forward: reading them in their order in
+    the archive decompresses it once, while going back decompresses it again from its start.
+
+    Parameters:
+    archive_path (str): Path of a .zip or .tar archive, possibly compressed.
+
+    Returns:
+    tuple: (archive, members), the opened ZipFile or TarFile, and the ZipInfo or TarInfo of each
+           member that is a file, by name, in their order in the archive.
+    """
+    key = os.path.abspath(archive_path)
+    stat = os.stat(archive_path)
+    entry = archive_cache.pop(key, None)
+    if entry is not None and entry[0] != (stat.st_size, stat.st_mtime_ns):
+        entry[1].close()
+        entry = None
+    if entry is None:
+        if archive_path.endswith('.zip'):
+            archive = zipfile.ZipFile(archive_path)
+            members = {info.filename: info for info in archive.infolist() if not info.is_dir()}
+        else:
+            archive = tarfile.open(archive_path)
+            members = {info.name: info for info in archive.getmembers() if info.isfile()}
+        entry = ((stat.st_size, stat.st_mtime_ns), archive, members)
+    archive_cache[key] = entry
+    while len(archive_cache) > ARCHIVE_CACHE_SIZE:
+        archive_cache.popitem(last=False)[1][1].close()
+    return entry[1], entry[2]
+
+
+@atexit.register
+def close_archives():
+    """
+    Closes the archives kept open by open_archive().
+    """
+    while archive_cache:
+        archive_cache.popitem()[1][1].close()
+
+
+# A forked worker process shares the file positions of the archives of its parent, so it opens
+# its own
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=archive_cache.clear)
+
+
+def parse_shard(shard):
+    """
+    Reads a shard given as "i/N" or (i, N).
+
+    Parameters:
+    shard (str or tuple): The i-th of N shards, 1 <= i <= N.
+
+    Returns:
+    tuple: (i, N).
+    """
+    try:
+        index, count = map(int, shard.split('/') if isinstance(shard, str) else shard)
+    except (TypeError, ValueError):
+        raise ValueError("\"{}\" is not a shard, please input a shard as i/N.".format(shard))
+    if not 1 <= index <= count:
+        raise ValueError("\"{}\" is not a shard, please input a shard as i/N with 1 <= i <= N.".format(shard))
+    return index, count
+
+
+def get_shard(relative_path, count):
+    """
+    Gives the shard of a file from a SHA-1 hash of its relative path, which is the same on every
+    machine and run, unlike the hash() of a string.
+
+    Parameters:
+    relative_path (str): Path of the file relative to its folder, with '/' separators.
+    count (int): Number of shards.
+
+    Returns:
+    int: The shard of the file, from 1 to count.
+    """
+    digest = hashlib.sha1(relative_path.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
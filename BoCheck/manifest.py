@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from .bocheck.recognizor import RULES_VERSION
+from .load import open_file, get_file_stat
+
+
+# Names of the manifest file in the folder of an incremental run, and of the journal the files
+# completed since the manifest was written are appended to
+MANIFEST_NAME = 'manifest.json'
+JOURNAL_NAME = 'journal.jsonl'
+
+
+class Manifest:
+    """
+    Manifest of an incremental run of process_dir(), kept in a folder along with the result of
+    each file. Each file is recorded with its size, modification time and content hash, under the
+    rule version and options its result was computed with, so that the next run can reuse the
+    results of the files that did not change.
+
+    Each stored result is also recorded at once in a journal, so that a run that is interrupted,
+    even killed, is resumed by the next run from the files it completed.
+
+    Parameters:
+    cache_dir (str): Folder of the manifest and of the results, created if missing.
+    options (tuple): Options the results are computed with; results of other options are not reused.
+    """
+    def __init__(self, cache_dir, options=()):
+        self.cache_dir = cache_dir
+        self.options = list(options)
+        self.files = {}
+        self.skipped = 0
+        self.recomputed = 0
+        self.journal = None
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, encoding='utf-8') as file:
+                manifest = json.load(file)
+            # Results computed under other rules or options are all recomputed
+            if self.is_current(manifest):
+                self.files = manifest.get('files', {})
+        journal_path = os.path.join(cache_dir, JOURNAL_NAME)
+        if os.path.isfile(journal_path):
+            with open(journal_path, encoding='utf-8') as file:
+                lines = file.read().splitlines()
+            entries = []
+            for line in lines:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # The last line of a journal may be cut by the end of its run
+                    break
+            if entries and self.is_current(entries[0]):
+                for entry in entries[1:]:
+                    self.files[entry.pop('key')] = entry
+        self.checkpoint()
+    
+    def is_current(self, header):
+        """
+        Tells whether a manifest or journal was written under the current rules and options.
+        """
+        return header.get('version') == RULES_VERSION and header.get('options') == self.options
+
+    def is_unchanged(self, key, file_path):
+        """
+        Tells whether a file is the same as when its result was stored. A file of another size has
+        changed, one of the same size and modification time is taken as unchanged, and otherwise
+        its content hash is compared.
+
+        Parameters:
+        key (str): Name of the file in the manifest.
+        file_path (str): Path of the file, or "archive!member" name of a member of an archive.
+
+        Returns:
+        bool: True if the stored result of the file can be reused.
+        """
+        entry = self.files.get(key)
+        if entry is None or not os.path.isfile(os.path.join(self.cache_dir, entry['result'])):
+            return False
+        size, mtime = get_file_stat(file_path)
+        if entry['size'] == size and entry['mtime'] == mtime:
+            return True
+        if entry['size'] != size:
+            return False
+        if entry['hash'] != get_file_hash(file_path):
+            return False
+        entry['size'], entry['mtime'] = size, mtime
+        return True
+
+    def load(self, key):
+        """
+        Loads the stored result of an unchanged file.
+
+        Parameters:
+        key (str): Name of the file in the manifest.
+
+        Returns:
+        pd.DataFrame: The result of the file.
+        """
+        self.skipped += 1
+        return pd.read_pickle(os.path.join(self.cache_dir, self.files[key]['result']))
+
+    def store(self, key, file_path, result, file_hash=None):
+        """
+        Stores the result of a file, and records the file in the manifest.
+
+        Parameters:
+        key (str): Name of the file in the manifest.
+        file_path (str): Path of the file, or "archive!member" name of a member of an archive.
+        result (pd.DataFrame): The result of the file.
+        file_hash (str, optional): Hash of the file, as from read_file() when it was loaded; the
+                                   file is read again to hash it if None.
+        """
+        self.recomputed += 1
+        result_name = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl'
+        pd.to_pickle(result, os.path.join(self.cache_dir, result_name))
+        size, mtime = get_file_stat(file_path)
+        if file_hash is None:
+            file_hash = get_file_hash(file_path)
+        self.files[key] = {'size': size, 'mtime': mtime, 'hash': file_hash, 'result': result_name}
+        self.journal.write(json.dumps(dict(self.files[key], key=key), ensure_ascii=False) + '\n')
+        self.journal.flush()
+
+    def save(self, keys):
+        """
+        Writes the manifest, forgetting the files that are no longer found and their results.
+
+        Parameters:
+        keys (iterable): Names of the files found by the run.
+        """
+        keys = set(keys)
+        for key in [key for key in self.files if key not in keys]:
+            result_path = os.path.join(self.cache_dir, self.files.pop(key)['result'])
+            if os.path.isfile(result_path):
+                os.remove(result_path)
+        self.checkpoint()
+        self.journal.close()
+    
+    def checkpoint(self):
+        """
+        Writes the manifest with the files recorded so far, and starts a new journal.
+        """
+        if self.journal is not None:
+            self.journal.close()
+        manifest = {'version': RULES_VERSION, 'options': self.options, 'files': self.files,
+                    'skipped': self.skipped, 'recomputed': self.recomputed}
+        # The manifest is replaced at once, so that an interrupted write does not lose it, and the
+        # journal is only started again once the manifest holds its files
+        manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=1)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        self.journal = open(os.path.join(self.cache_dir, JOURNAL_NAME), 'w', encoding='utf-8')
+        self.journal.write(json.dumps({'version': RULES_VERSION, 'options': self.options}) + '\n')
+        self.journal.flush()
+
+
+def get_file_hash(file_path, block_size=1 << 20):
+    """
+    Gives the SHA-1 hash of the decompressed content of a file, or of a member of an archive, as
+    read_file() does.
+    """
+    digest = hashlib.sha1()
+    with open_file(file_path) as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
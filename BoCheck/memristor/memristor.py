@@ -1,6 +1,36 @@
 import numpy as np
 
 
+# Read voltage applied for each bit value: 0, 1, and 2 (no voltage)
+READ_VOLTAGE = np.array([0.2, 0.008, 0.0])
+
+
+def to_bits(codes):
+    """
+    Converts binary codes into an (N, 8) uint8 bit matrix. Bit arrays are passed through, and
+    string codes are converted, with any position that is not '0' or '1' set to 2 (no voltage).
+
+    Parameters:
+    codes (list or np.ndarray): Binary codes as strings or bit arrays, or an (N, 8) bit matrix.
+
+    Returns:
+    bits (np.ndarray): (N, 8) matrix of bits.
+    """
+    if isinstance(codes, np.ndarray):
+        return codes.reshape(-1, 8)
+    bits = np.full([len(codes), 8], 2, dtype=np.uint8)
+    for i, code in enumerate(codes):
+        if isinstance(code, str):
+            for j, bit in enumerate(code[:8]):
+                if bit == '0':
+                    bits[i, j] = 0
+                elif bit == '1':
+                    bits[i, j] = 1
+        else:
+            bits[i] = code
+    return bits
+
+
 class memristor:
     """
     A class to simulate a memristor with customizable parameters and a crossbar array structure.
@@ -87,20 +117,15 @@ class memristor:
 
         Parameters:
         array (np.ndarray): The crossbar array to be modified.
-        word_code_list (list): List of binary codes for the memristors in each row of the array.
+        word_code_list (list or np.ndarray): Binary codes for the memristors in each column of the array,
+                                             as strings or as an (N, 8) bit matrix.
 
         Returns:
         array (np.ndarray): Updated crossbar array with new resistance values.
         """
-        array = np.zeros([8, 50])
-        column = 0
-        for i in range(len(word_code_list)):
-            for j in range(8):
-                if word_code_list[i][j] == '0':
-                    array[j][i] = 2500
-                else:
-                    array[j][i] = 100
-        array[array == 0] = 2500
+        bits = to_bits(word_code_list)
+        array = np.full([8, 50], 2500.0)
+        array[:, :len(bits)] = np.where(bits.T == 0, 2500, 100)
         return array  
 
     def read_array(self, code, array):
@@ -108,21 +133,33 @@ class memristor:
         Reads values from the crossbar array based on an input code and returns the summed result.
 
         Parameters:
-        code (str): Binary code to specify which elements of the array to read.
+        code (str or np.ndarray): Binary code to specify which elements of the array to read.
         array (np.ndarray): Crossbar array containing resistance values.
 
         Returns:
         result (float): Summed result of voltage divided by array resistance values.
         """
-        voltage = np.zeros([8, 1])
-        for i in range(len(code)):
-            if code[i] == '0':
-                voltage[i] = 0.2
-            elif code[i] == '1':
-                voltage[i] = 0.008
+        voltage = READ_VOLTAGE[to_bits([code])[0]][:, np.newaxis]
         result = np.sum(voltage / array, axis=0)
         return result
 
+    def read_array_batch(self, codes, array):
+        """
+        Reads the crossbar array with a batch of input codes at once, i.e. computes the
+        column currents I = V·G for every input voltage vector in a single operation.
+
+        Parameters:
+        codes (list or np.ndarray): N binary codes, one per input to read, or an (N, 8) bit matrix.
+        array (np.ndarray): Crossbar array containing resistance values.
+
+        Returns:
+        result (np.ndarray): (N, 50) matrix of summed currents, one row per input code.
+        """
+        voltage = READ_VOLTAGE[to_bits(codes)]
+        # Same per-cell division and row order as read_array, so the currents are bitwise identical
+        result = np.sum(voltage[:, :, np.newaxis] / array, axis=1)
+        return result
+
     # def position_recognization(self,code_list,words,words_code):
     #     if len(code_list) == 1:
     #         for code in code_list:
@@ -1,133 +1,457 @@
+import mmap
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain, repeat
 from tqdm import tqdm
 import pandas as pd
-from .bocheck.checker import Checker
-from .utils.file import to_table
-from .load import load_file, load_dir
+from .bocheck.checker import Checker, CHECK_COLUMN, OFFSET_COLUMNS
+from .utils.tokenize import split_shards, split_byte_shards
+from .utils.file import iter_txt_mmap
+from .utils.sink import open_sink, iter_table, read_file_list, NAME_COLUMN
+from .load import load_file, read_file, stream_file, iter_files, is_file, get_file_size, split_member
+from .manifest import Manifest
 
 
 def process_text(text, component_recognization=True, spelling_check=True, 
-            return_result=True, table_path=None, print_result=True):
+            return_result=True, table_path=None, print_result=True, offsets=False, cache_size=None):
     if type(text) != str:
         raise ValueError("\"text\" is not string, please input a string.")
     if os.path.isfile(text):  
         raise ValueError("\"{}\" is a file, please use functrion 'process_file'.".format(text))
     if os.path.isdir(text):  
         raise ValueError("\"{}\" is a folder, please use functrion 'process_dir'.".format(text))
-    checker = Checker()
+    checker = Checker(cache_size=cache_size)
     
-    if component_recognization:
-        recognization_result = checker.recognization_text(text)
-    else:
-        recognization_result = None
-    if spelling_check:
-        check_result = checker.check_text(text)
-    else:
-        check_result = None
-    
-    if recognization_result is not None and check_result is not None:
-        result = recognization_result
-        result['拼写检查'] = check_result['拼写检查']
-    elif recognization_result is None and check_result is not None:
-        result = check_result
-    elif recognization_result is not None and check_result is None:
-        result = recognization_result
-    else:
-        result = None
+    result = checker.analyze(text, component_recognization, spelling_check, offsets)
         
     if print_result:
         print(result)
     
-    if table_path is not None:
-        to_table(result, table_path)
+    if table_path is not None and result is not None:
+        with open_sink(table_path) as sink:
+            sink.write(result)
         
     if return_result:
         return result
     
     
 def process_file(file_path, component_recognization=True, spelling_check=True, 
-            return_result=True, table_path=None, print_result=True):
+            return_result=True, table_path=None, print_result=True, offsets=False, workers=1, cache_size=None):
     if type(file_path) != str:
         raise ValueError("\"{}\" is not a file, please input a file path or file path.".format(file_path))
-    if not os.path.isfile(file_path):  
+    if not is_file(file_path):  
         raise ValueError("\"{}\" is not a file, please input a file path.".format(file_path))
     if os.path.isdir(file_path):  
         raise ValueError("\"{}\" is a folder, please use functrion 'process_dir'.".format(file_path))
-    checker = Checker()
-    text = load_file(file_path)
     
-    if component_recognization:
-        recognization_result = checker.recognization_text(text)
-    else:
-        recognization_result = None
-    if spelling_check:
-        check_result = checker.check_text(text)
+    if workers == 1:
+        # The file is read in chunks and the results are written batch by batch, so the file and
+        # its results are only held in memory when they are returned or printed
+        checker = Checker(cache_size=cache_size)
+        sink = open_sink(table_path) if table_path is not None else None
+        result = checker.analyze('', component_recognization, spelling_check, offsets)
+        batches, written = [], False
+        try:
+            for batch in checker.iter_analyze(stream_file(file_path), component_recognization, spelling_check,
+                                              offsets=offsets):
+                if batch is None:
+                    break
+                if sink is not None:
+                    sink.write(batch)
+                    written = True
+                if return_result or print_result:
+                    batches.append(batch)
+            # An empty file still gets a table with the column names
+            if sink is not None and result is not None and not written:
+                sink.write(result)
+        except BaseException:
+            # A failed or interrupted run leaves the table as it was
+            if sink is not None:
+                sink.abort()
+            raise
+        if sink is not None:
+            sink.close()
+        if batches:
+            result = pd.concat(batches, ignore_index=True)
     else:
-        check_result = None
-    
-    if recognization_result is not None and check_result is not None:
-        result = recognization_result
-        result['拼写检查'] = check_result['拼写检查']
-    elif recognization_result is None and check_result is not None:
-        result = check_result
-    elif recognization_result is not None and check_result is None:
-        result = recognization_result
-    else:
-        result = None
+        result = analyze_file_shards(file_path, component_recognization, spelling_check, offsets, workers, cache_size)
+        if table_path is not None and result is not None:
+            with open_sink(table_path) as sink:
+                sink.write(result)
         
     if print_result:
         print(result)
-    
-    if table_path is not None:
-        to_table(result, table_path)
         
     if return_result:
         return result
     
     
 def process_dir(dir_path, component_recognization=True, spelling_check=True, 
-            return_result=True, table_path=None, print_result=True):
+            return_result=True, table_path=None, print_result=True, offsets=False, workers=1,
+            include=None, exclude=None, recursive=True, incremental=False, cache_dir=None, cache_size=None,
+            shard=None):
     if type(dir_path) != str:
         raise ValueError("\"{}\" is not a folder, lease input a folder path or folder path.".format(dir_path))
     if not os.path.isdir(dir_path):  
         raise ValueError("\"{}\" is not a folder, lease input a folder path or folder path.".format(dir_path))
     if os.path.isfile(dir_path):  
         raise ValueError("\"{}\" is a file, please use functrion 'process_file'.".format(dir_path))
-    checker = Checker()
-    texts = load_dir(dir_path)
+    # Only the paths are listed up front; each file is loaded when it is analyzed
+    file_paths = list(iter_files(dir_path, include, exclude, recursive=recursive, shard=shard))
+    changed_paths, manifest = file_paths, None
+    if incremental:
+        # The results of the files are kept with a manifest, next to the table by default, and only
+        # new or modified files are analyzed again
+        if cache_dir is None:
+            if table_path is None:
+                raise ValueError("\"cache_dir\" is None, please input a folder path or a table path.")
+            cache_dir = table_path + '.cache'
+        manifest = Manifest(cache_dir, (component_recognization, spelling_check, offsets))
+        unchanged, changed_paths = [], []
+        for file_path in file_paths:
+            if manifest.is_unchanged(os.path.relpath(file_path, dir_path), file_path):
+                unchanged.append(file_path)
+            else:
+                changed_paths.append(file_path)
     results = {}
+    sink = open_sink(table_path) if table_path is not None else None
     
-    for file_path, text in tqdm(texts.items()):
-        if component_recognization:
-            recognization_result = checker.recognization_text(text)
-        else:
-            recognization_result = None
-        if spelling_check:
-            check_result = checker.check_text(text)
-        else:
-            check_result = None
-        
-        if recognization_result is not None and check_result is not None:
-            result = recognization_result
-            result['拼写检查'] = check_result['拼写检查']
-        elif recognization_result is None and check_result is not None:
-            result = check_result
-        elif recognization_result is not None and check_result is None:
-            result = recognization_result
-        else:
-            result = None
-        
-        results[os.path.basename(file_path)] = result
-        
-        if print_result:
-            print(file_path)
-            print(result)
-        
-        if table_path is not None:
-            with pd.ExcelWriter(table_path, engine='xlsxwriter') as writer:
-                for filename, result in results.items():
-                    result.to_excel(writer, sheet_name=filename, index=False, engine='openpyxl')
+    try:
+        file_results = iter_process_files(changed_paths, component_recognization, spelling_check, offsets, workers,
+                                          cache_size, hashes=manifest is not None)
+        if manifest is not None:
+            file_results = chain(((file_path, manifest.load(os.path.relpath(file_path, dir_path)))
+                                  for file_path in unchanged), store_results(file_results, manifest, dir_path))
+        for file_path, result in tqdm(file_results, total=len(file_paths)):
+            if return_result:
+                results[file_path] = result
+            
+            if print_result:
+                print(file_path)
+                print(result)
+            
+            if sink is not None and result is not None:
+                sink.write(result, os.path.relpath(file_path, dir_path))
+    except BaseException:
+        # A failed or interrupted run leaves the table as it was; an incremental run is resumed by
+        # running it again, reusing the results of the files completed so far
+        if sink is not None:
+            sink.abort()
+        raise
+    finally:
+        if manifest is not None:
+            manifest.save(os.path.relpath(file_path, dir_path) for file_path in file_paths)
+    if sink is not None:
+        sink.close()
+            
+    if manifest is not None:
+        # Reported along with the progress bar, also when only a table is written
+        print("{} files recomputed, {} skipped".format(manifest.recomputed, manifest.skipped), file=sys.stderr)
             
     if return_result:
-        return results
-        
\ No newline at end of file
+        return {os.path.relpath(file_path, dir_path): results[file_path] for file_path in file_paths}
+    
+    
+def store_results(file_results, manifest, dir_path):
+    """
+    Stores the results of files in the manifest of an incremental run as they come.
+
+    Parameters:
+    file_results (iterable): (file_path, result, file_hash) for each file, as from
+                             iter_process_files() with hashes=True.
+    manifest (Manifest): Manifest of the run.
+    dir_path (str): Folder the files are named relative to in the manifest.
+
+    Returns:
+    Iterator[tuple]: The (file_path, result) of each file.
+    """
+    for file_path, result, file_hash in file_results:
+        manifest.store(os.path.relpath(file_path, dir_path), file_path, result, file_hash)
+        yield file_path, result
+    
+    
+def merge_tables(table_paths, table_path=None, chunk_size=65536):
+    """
+    Merges the tables written by runs over the shards of a corpus, e.g. by process_dir() with
+    shard="i/N" on several machines, into one table, and gives summary statistics of the whole
+    corpus. The tables are read and written chunk by chunk, in the order given.
+
+    Parameters:
+    table_paths (list): Paths of the tables to merge: .csv, .jsonl or .ndjson (optionally
+                        followed by .gz) or .parquet, with the same columns.
+    table_path (str or sink, optional): Path of the merged table, or an opened sink to write it to.
+                                        The merged table is not written if None.
+    chunk_size (int): Number of rows read at a time.
+
+    Returns:
+    dict: Numbers of tables, files, syllables and misspelled syllables (None without the "拼写检查"
+          column), rate of misspelled syllables, and number of files found in more than one table,
+          which are shards that overlap. The files of a table are those listed next to it by its
+          sink, with those without any row, or else those of its rows.
+    """
+    if isinstance(table_paths, str):
+        table_paths = [table_paths]
+    summary = {'tables': len(table_paths), 'files': 0, 'syllables': 0, 'errors': None, 'error_rate': None,
+               'duplicate_files': 0}
+    files = set()
+    sink = open_sink(table_path) if isinstance(table_path, str) else table_path
+    try:
+        for path in table_paths:
+            # The files of a table are those it lists, including the files without any row, e.g.
+            # without errors when only errors were written, or those of its rows without a list
+            listed_files = read_file_list(path)
+            table_files = set(listed_files or ())
+            for chunk in iter_table(path, chunk_size):
+                if sink is not None:
+                    sink.write(chunk)
+                summary['syllables'] += len(chunk)
+                if CHECK_COLUMN in chunk.columns:
+                    summary['errors'] = (summary['errors'] or 0) + int((~chunk[CHECK_COLUMN].astype(bool)).sum())
+                if listed_files is None and NAME_COLUMN in chunk.columns:
+                    table_files.update(chunk[NAME_COLUMN].astype(str))
+            summary['duplicate_files'] += len(table_files & files)
+            files |= table_files
+            if sink is not None and hasattr(sink, 'add_names'):
+                sink.add_names(sorted(table_files))
+    except BaseException:
+        if isinstance(table_path, str):
+            sink.abort()
+        raise
+    if isinstance(table_path, str):
+        sink.close()
+    summary['files'] = len(files)
+    if summary['errors'] is not None and summary['syllables']:
+        summary['error_rate'] = summary['errors'] / summary['syllables']
+    return summary
+    
+    
+def iter_process_files(file_paths, component_recognization=True, spelling_check=True, offsets=False, workers=1,
+                       cache_size=None, hashes=False):
+    """
+    Analyzes files and yields their results as they complete.
+
+    With more than one worker, the files are analyzed in a pool of processes, each with its own
+    Checker built once, and are submitted largest first so that a large file does not start last
+    and keep the other workers idle; results then come in the order the files complete.
+
+    Parameters:
+    file_paths (list): Paths of the files to analyze.
+    component_recognization (bool): If True, the results contain the syllable components.
+    spelling_check (bool): If True, the results contain the spell check result.
+    offsets (bool): If True, the results contain the offsets of each syllable in its file.
+    workers (int): Number of worker processes, 1 to analyze the files in this process.
+    cache_size (int, optional): Size of the syllable cache of each Checker, as in Checker().
+    hashes (bool): If True, the hash of each file, from read_file(), is given after its result.
+
+    Returns:
+    Iterator[tuple]: (file_path, result) for each file, or (file_path, result, file_hash) if hashes
+                     is True, result being as returned by Checker.analyze().
+    """
+    if type(workers) != int or workers < 1:
+        raise ValueError("\"workers\" is not a positive integer, please input a positive integer.")
+    if workers == 1:
+        checker = Checker(cache_size=cache_size)
+        for file_path in file_paths:
+            text, file_hash = read_file(file_path) if hashes else (load_file(file_path), None)
+            result = checker.analyze(text, component_recognization, spelling_check, offsets)
+            yield (file_path, result, file_hash) if hashes else (file_path, result)
+        return
+    
+    file_paths = sorted(file_paths, key=get_rank_size, reverse=True)
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(cache_size,)) as executor:
+        futures = {executor.submit(analyze_file, file_path, component_recognization, spelling_check, offsets,
+                                   hashes): file_path
+                   for file_path in file_paths}
+        try:
+            for future in as_completed(futures):
+                yield (futures[future],) + future.result() if hashes else (futures[future], future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    
+def get_rank_size(file_path):
+    """
+    Gives the size a file is ranked by when files are submitted to worker processes, largest first.
+    Members of a compressed tar archive, which can only be read forward, are ranked by the size of
+    their archive, so that they keep their order in it and each worker reads the archive once.
+
+    Parameters:
+    file_path (str): Path of the file, or "archive!member" name of a member of an archive.
+
+    Returns:
+    int: Size of the file or member, or of the archive of a member of a compressed tar archive.
+    """
+    archive_path, member = split_member(file_path)
+    if member is not None and not archive_path.endswith(('.zip', '.tar')):
+        return os.path.getsize(archive_path)
+    return get_file_size(file_path)
+    
+    
+def analyze_shards(text, component_recognization=True, spelling_check=True, offsets=False, workers=2,
+                   cache_size=None):
+    """
+    Analyzes a text in a pool of worker processes, each with its own Checker built once. The text
+    is cut at shad boundaries into a few shards per worker, and the results of the shards are put
+    back together in the order of the text, with offsets relative to the whole text.
+
+    Parameters:
+    text (str): Input text containing Tibetan syllables.
+    component_recognization (bool): If True, the result contains the syllable components.
+    spelling_check (bool): If True, the result contains the spell check result.
+    offsets (bool): If True, the result contains the offsets of each syllable in the text.
+    workers (int): Number of worker processes.
+    cache_size (int, optional): Size of the syllable cache of each Checker, as in Checker().
+
+    Returns:
+    pd.DataFrame: Result as returned by Checker.analyze().
+    """
+    if type(workers) != int or workers < 1:
+        raise ValueError("\"workers\" is not a positive integer, please input a positive integer.")
+    if not component_recognization and not spelling_check:
+        return None
+    shards = split_shards(text, workers * 4)
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(cache_size,)) as executor:
+        results = list(executor.map(analyze_shard, (text[start:end] for start, end in shards),
+                                    (start for start, _ in shards), repeat(component_recognization),
+                                    repeat(spelling_check), repeat(offsets)))
+    # Shards without syllables would turn the column types into object
+    results = [result for result in results if len(result)] or results[:1]
+    return pd.concat(results, ignore_index=True)
+    
+    
+def analyze_txt_shards(file_path, component_recognization=True, spelling_check=True, offsets=False, workers=2,
+                       cache_size=None):
+    """
+    Analyzes a .txt file in a pool of worker processes, as analyze_shards() does for a text. The
+    file is memory-mapped and cut into byte ranges at shad boundaries, and each worker reads and
+    decodes its own range, so the text of the file is never loaded or sent to the workers whole.
+
+    Parameters:
+    file_path (str): Path of the .txt file.
+    component_recognization (bool): If True, the result contains the syllable components.
+    spelling_check (bool): If True, the result contains the spell check result.
+    offsets (bool): If True, the result contains the offsets of each syllable in the file.
+    workers (int): Number of worker processes.
+    cache_size (int, optional): Size of the syllable cache of each Checker, as in Checker().
+
+    Returns:
+    pd.DataFrame: Result as returned by Checker.analyze().
+    """
+    if type(workers) != int or workers < 1:
+        raise ValueError("\"workers\" is not a positive integer, please input a positive integer.")
+    if not component_recognization and not spelling_check:
+        return None
+    with open(file_path, 'rb') as file:
+        # An empty file cannot be memory-mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            shards = [(0, 0)]
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                shards = split_byte_shards(data, workers * 4)
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(cache_size,)) as executor:
+        results = list(executor.map(analyze_txt_range, repeat(file_path), *zip(*shards),
+                                    repeat(component_recognization), repeat(spelling_check), repeat(offsets)))
+    # The offsets of a range are relative to its start, which is known once the characters of the
+    # ranges before it are counted
+    start = 0
+    for result, length in results:
+        if offsets:
+            result[OFFSET_COLUMNS] += start
+        start += length
+    # Shards without syllables would turn the column types into object
+    results = [result for result, _ in results if len(result)] or [results[0][0]]
+    return pd.concat(results, ignore_index=True)
+    
+    
+def analyze_file_shards(file_path, component_recognization=True, spelling_check=True, offsets=False, workers=2,
+                        cache_size=None):
+    """
+    Analyzes a file split across worker processes, with analyze_txt_shards() for a .txt file on
+    disk and analyze_shards() on the loaded text otherwise.
+
+    Parameters:
+    file_path (str): Path of the file, or "archive!member" name of a member of an archive.
+    component_recognization, spelling_check, offsets, workers, cache_size: As in analyze_shards().
+
+    Returns:
+    pd.DataFrame: Result as returned by Checker.analyze().
+    """
+    if os.path.isfile(file_path) and file_path.endswith('.txt'):
+        return analyze_txt_shards(file_path, component_recognization, spelling_check, offsets, workers, cache_size)
+    return analyze_shards(load_file(file_path), component_recognization, spelling_check, offsets, workers, cache_size)
+    
+    
+# Checker of a worker process, built once by init_worker()
+worker_checker = None
+
+
+def init_worker(cache_size=None):
+    """
+    Builds the Checker of a worker process.
+
+    Parameters:
+    cache_size (int, optional): Size of the syllable cache of the Checker, as in Checker().
+    """
+    global worker_checker
+    worker_checker = Checker(cache_size=cache_size)
+    
+    
+def analyze_file(file_path, component_recognization=True, spelling_check=True, offsets=False, hashes=False):
+    """
+    Loads and analyzes a file with the Checker of the worker process.
+
+    Parameters:
+    file_path (str): Path of the file to analyze.
+    component_recognization (bool): If True, the result contains the syllable components.
+    spelling_check (bool): If True, the result contains the spell check result.
+    offsets (bool): If True, the result contains the offsets of each syllable in the file.
+    hashes (bool): If True, the hash of the file, from read_file(), is given with the result.
+
+    Returns:
+    pd.DataFrame: Result as returned by Checker.analyze(), or (result, file_hash) if hashes is True.
+    """
+    if hashes:
+        text, file_hash = read_file(file_path)
+        return worker_checker.analyze(text, component_recognization, spelling_check, offsets), file_hash
+    return worker_checker.analyze(load_file(file_path), component_recognization, spelling_check, offsets)
+    
+    
+def analyze_shard(text, start=0, component_recognization=True, spelling_check=True, offsets=False):
+    """
+    Analyzes a shard of a text with the Checker of the worker process.
+
+    Parameters:
+    text (str): Text of the shard.
+    start (int): Offset of the shard in the whole text.
+    component_recognization (bool): If True, the result contains the syllable components.
+    spelling_check (bool): If True, the result contains the spell check result.
+    offsets (bool): If True, the result contains the offsets of each syllable in the whole text.
+
+    Returns:
+    pd.DataFrame: Result as returned by Checker.analyze().
+    """
+    result = worker_checker.analyze(text, component_recognization, spelling_check, offsets)
+    if offsets:
+        result[OFFSET_COLUMNS] += start
+    return result
+    
+    
+def analyze_txt_range(file_path, start, end, component_recognization=True, spelling_check=True, offsets=False):
+    """
+    Reads and analyzes a byte range of a .txt file with the Checker of the worker process.
+
+    Parameters:
+    file_path (str): Path of the .txt file.
+    start, end (int): Byte offsets of the range.
+    component_recognization (bool): If True, the result contains the syllable components.
+    spelling_check (bool): If True, the result contains the spell check result.
+    offsets (bool): If True, the result contains the offsets of each syllable in the range.
+
+    Returns:
+    tuple: (result, length), the result as returned by Checker.analyze() and the number of
+           characters of the range.
+    """
+    text = ''.join(iter_txt_mmap(file_path, start, end))
+    return worker_checker.analyze(text, component_recognization, spelling_check, offsets), len(text)
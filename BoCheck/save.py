@@ -1 +1,2 @@
-from .utils.file import to_table
\ No newline at end of file
+from .utils.file import to_table
+from .utils.sink import ExcelSink, CsvSink, JsonlSink, ParquetSink, open_sink, iter_table
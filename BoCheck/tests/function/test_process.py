@@ -1,3 +1,4 @@
+import os
 import pytest
 import pandas as pd
 from BoCheck.process import process_text, process_file, process_dir
@@ -69,5 +70,185 @@ def test_process_dir_error():
         process_dir(example_txt)
 
 
+def test_process_dir_workers():
+    """
+    Test that process_dir gives the same results with a pool of worker processes.
+    """
+    result = process_dir(example_dir, print_result=False)
+    parallel_result = process_dir(example_dir, print_result=False, workers=2)
+    assert list(parallel_result) == list(result)
+    for filename in result:
+        assert parallel_result[filename].equals(result[filename])
+    with pytest.raises(ValueError):
+        process_dir(example_dir, workers=0)
+
+
+def test_process_file_workers():
+    """
+    Test that process_file gives the same result when the file is split across worker processes.
+    """
+    for offsets in (False, True):
+        result = process_file(example_txt, print_result=False, offsets=offsets)
+        assert process_file(example_txt, print_result=False, offsets=offsets, workers=3).equals(result)
+    with pytest.raises(ValueError):
+        process_file(example_txt, workers=0)
+
+
+def test_process_archive(tmp_path):
+    """
+    Test that a member of an archive is processed like the file it holds.
+    """
+    import zipfile
+    archive_path = str(tmp_path / 'corpus.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.write(example_txt, 'example.txt')
+    result = process_file(example_txt, print_result=False, offsets=True)
+    assert process_file(archive_path + '!example.txt', print_result=False, offsets=True).equals(result)
+    results = process_dir(str(tmp_path), print_result=False, offsets=True)
+    assert list(results) == ['corpus.zip!example.txt']
+    assert results['corpus.zip!example.txt'].equals(result)
+
+
+def test_process_dir_incremental(tmp_path, capsys):
+    """
+    Test that an incremental process_dir only analyzes new or modified files again.
+    """
+    import json
+    import shutil
+    dir_path = tmp_path / 'corpus'
+    dir_path.mkdir()
+    for name in ('a.txt', 'b.txt', 'c.txt'):
+        shutil.copy(example_txt, str(dir_path / name))
+    table_path = str(tmp_path / 'result.csv')
+    expected = process_dir(str(dir_path), print_result=False)
+    
+    def run():
+        results = process_dir(str(dir_path), print_result=False, table_path=table_path, incremental=True)
+        assert all(results[name].equals(expected['a.txt']) for name in results)
+        with open(table_path + '.cache/manifest.json', encoding='utf-8') as file:
+            manifest = json.load(file)
+        return manifest['recomputed'], manifest['skipped'], sorted(manifest['files'])
+    
+    assert run() == (3, 0, ['a.txt', 'b.txt', 'c.txt'])
+    assert run() == (0, 3, ['a.txt', 'b.txt', 'c.txt'])
+    assert "0 files recomputed, 3 skipped" in capsys.readouterr().err
+    # A touched file is hashed and still skipped, a modified file is analyzed again
+    os.utime(str(dir_path / 'a.txt'), (0, 0))
+    with open(str(dir_path / 'b.txt'), 'a', encoding='utf-8') as file:
+        file.write('\n')
+    os.remove(str(dir_path / 'c.txt'))
+    assert run() == (1, 1, ['a.txt', 'b.txt'])
+    assert len(pd.read_csv(table_path)) == 2 * len(expected['a.txt'])
+    # Results of other options are not reused
+    process_dir(str(dir_path), print_result=False, table_path=table_path, incremental=True, spelling_check=False)
+    assert run() == (2, 0, ['a.txt', 'b.txt'])
+    with pytest.raises(ValueError):
+        process_dir(str(dir_path), print_result=False, incremental=True)
+
+
+def test_process_dir_resume(tmp_path):
+    """
+    Test that an interrupted incremental process_dir leaves the table as it was, and that the next
+    run resumes from the files completed so far.
+    """
+    import json
+    import shutil
+    dir_path = tmp_path / 'corpus'
+    dir_path.mkdir()
+    for name in ('a.txt', 'b.txt'):
+        shutil.copy(example_txt, str(dir_path / name))
+    # A broken .docx file stops the run after the .txt files
+    (dir_path / 'c.docx').write_bytes(b'broken')
+    table_path = str(tmp_path / 'result.csv')
+    with pytest.raises(Exception):
+        process_dir(str(dir_path), print_result=False, table_path=table_path, incremental=True)
+    assert sorted(os.listdir(str(tmp_path))) == ['corpus', 'result.csv.cache']
+    # A run killed while writing the journal leaves a cut line
+    with open(table_path + '.cache/journal.jsonl', 'a', encoding='utf-8') as file:
+        file.write('{"key": "c.do')
+    shutil.copy("tests/examples/example.docx", str(dir_path / 'c.docx'))
+    results = process_dir(str(dir_path), print_result=False, table_path=table_path, incremental=True)
+    with open(table_path + '.cache/manifest.json', encoding='utf-8') as file:
+        manifest = json.load(file)
+    assert (manifest['recomputed'], manifest['skipped']) == (1, 2)
+    assert len(pd.read_csv(table_path)) == sum(len(result) for result in results.values())
+
+
+def test_process_dir_shards(tmp_path):
+    """
+    Test that the outputs of the shards of a folder merge into the output of the whole folder.
+    """
+    import shutil
+    from BoCheck.process import merge_tables
+    dir_path = tmp_path / 'corpus'
+    dir_path.mkdir()
+    for i in range(6):
+        shutil.copy(example_txt, str(dir_path / '{}.txt'.format(i)))
+    results = process_dir(str(dir_path), print_result=False)
+    table_paths = [str(tmp_path / 'shard{}.jsonl'.format(i)) for i in (1, 2)]
+    for i, table_path in enumerate(table_paths, 1):
+        process_dir(str(dir_path), print_result=False, table_path=table_path, shard='{}/2'.format(i))
+    merged_path = str(tmp_path / 'merged.csv')
+    summary = merge_tables(table_paths, merged_path)
+    syllables = sum(len(result) for result in results.values())
+    errors = sum(int((~result['拼写检查']).sum()) for result in results.values())
+    assert summary == {'tables': 2, 'files': 6, 'syllables': syllables, 'errors': errors,
+                       'error_rate': errors / syllables, 'duplicate_files': 0}
+    merged = pd.read_csv(merged_path)
+    assert sorted(merged['文件'].unique()) == sorted(results)
+    assert merge_tables([merged_path, table_paths[0]])['duplicate_files'] > 0
+
+
+def test_process_dir_incremental_reads_once(tmp_path, monkeypatch):
+    """
+    Test that an incremental process_dir hashes the files as they are loaded rather than reading
+    them again, and only hashes a member of an archive again once the member itself changes.
+    """
+    import json
+    import zipfile
+    from BoCheck import manifest
+    archive_path = str(tmp_path / 'corpus.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.write(example_txt, 'a.txt')
+    table_path = str(tmp_path / 'result.csv')
+
+    def get_file_hash(file_path):
+        raise AssertionError("\"{}\" is read again".format(file_path))
+
+    monkeypatch.setattr(manifest, 'get_file_hash', get_file_hash)
+    for workers, name in ((1, 'b.txt'), (2, 'c.txt'), (1, None)):
+        process_dir(str(tmp_path), print_result=False, table_path=table_path, incremental=True, workers=workers)
+        if name is not None:
+            with zipfile.ZipFile(archive_path, 'a') as archive:
+                archive.write(example_txt, name)
+    with open(table_path + '.cache/manifest.json', encoding='utf-8') as file:
+        assert json.load(file)['skipped'] == 2
+
+
+def test_merge_tables_empty_column(tmp_path):
+    """
+    Test that merging tables keeps a component column as text when the first chunks have no value
+    in it, in every table format.
+    """
+    from BoCheck.process import merge_tables
+    from BoCheck.utils.sink import open_sink, iter_table
+    first = process_text('ཀ་ཁ་', print_result=False)
+    second = process_text('གྲྭ་', print_result=False)
+    assert first['再下加字'].isna().all() and second['再下加字'].notna().all()
+    for extension in ('.csv', '.ndjson', '.parquet'):
+        if extension == '.parquet':
+            pytest.importorskip('pyarrow')
+        table_paths = [str(tmp_path / ('s1' + extension)), str(tmp_path / ('s2' + extension))]
+        for table_path, result in zip(table_paths, (first, second)):
+            with open_sink(table_path) as sink:
+                sink.write(result, 'a.txt')
+        for merged_extension in ('.ndjson', '.parquet'):
+            merged_path = str(tmp_path / ('merged' + merged_extension))
+            merge_tables(table_paths, merged_path, chunk_size=1)
+            merged = pd.concat(iter_table(merged_path), ignore_index=True)
+            assert merged['再下加字'].tolist() == [None, None, 'ྭ']
+            assert merged['文件'].tolist() == ['a.txt'] * 3
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -3,7 +3,7 @@ import pandas as pd
 import numpy as np
 from BoCheck import Checker
 from BoCheck.letters import *
-from BoCheck.utils.utils import get_bin
+from BoCheck.utils.utils import get_bin, get_bin_list
 
 
 checker = Checker()
@@ -69,5 +69,182 @@ def test_check_error():
         checker.check_text(45)
         
         
+def test_crossbars():
+    """
+    Test that every character class has a read-only crossbar programmed at construction.
+    """
+    for candidate in checker.candidates:
+        crossbar_array = checker.crossbars[candidate]
+        assert crossbar_array.shape == (8, 50)
+        assert not crossbar_array.flags.writeable
+
+
+def test_classify():
+    """
+    Test that a batched classification agrees with matching each character separately.
+    """
+    tibetan_match = checker.classify([get_bin(letter) for letter in example_syllable])
+    assert len(tibetan_match) == len(example_syllable)
+    for letter, letter_match in zip(example_syllable, tibetan_match):
+        for candidate in checker.candidates:
+            assert letter_match[candidate] == checker.match(get_bin(letter), candidate)
+    
+    word_match = checker.classify_words(['འཕྲིན', 'བཏང'])
+    assert [len(item) for item in word_match] == [5, 3]
+
+
+def test_related():
+    """
+    Test that the compiled relation matrices agree with matching against the relation tables.
+    """
+    for name, relation in checker.relations.items():
+        for key, letters in relation.items():
+            for letter in ROOT_LETTER + ROOT_LETTER_SHORT + SUFFIX_LETTER:
+                expected = checker.match_ori(letter, letters) is not None
+                assert checker.related(name, key, letter) == expected
+    assert checker.relation_matrix['prefix_root'].shape == (256, 256)
+    with pytest.raises(KeyError):
+        checker.related('suffix', 'ག', 'ན')
+
+
+def test_table_backend():
+    """
+    Test that the lookup-table backend gives the same results as the memristor backend.
+    """
+    table_checker = Checker(backend='table')
+    block = [chr(0xF00 + letter_id) for letter_id in range(256)]
+    assert table_checker.classify_words(block) == checker.classify_words(block)
+    for name, relation in checker.relations.items():
+        for key in relation:
+            for letter in block:
+                assert table_checker.related(name, key, letter) == checker.related(name, key, letter)
+    assert table_checker.recognization_text(example_text).equals(checker.recognization_text(example_text))
+    assert table_checker.check_text(example_text).equals(checker.check_text(example_text))
+    with pytest.raises(ValueError):
+        Checker(backend='analog')
+
+
+def test_get_bin_list():
+    """
+    Test the fixed-width code table encoding of Tibetan characters.
+    """
+    codes = get_bin_list(example_syllable)
+    assert codes.shape == (5, 8)
+    assert codes.dtype == np.uint8
+    assert ''.join(map(str, get_bin('ཕ'))) == format(ord('ཕ') - 0xF00, '08b')
+    assert (get_bin_list(['ཕ', 'ི']) == codes[[1, 3]]).all()
+    assert (get_bin('a') == 2).all()
+    assert (get_bin_list(['ཕ', '\ud800']) == [get_bin('ཕ'), get_bin('\ud800')]).all()
+
+
+def test_syllable_rules():
+    """
+    Test the compiled syllable rules and their dispatch table.
+    """
+    from BoCheck.bocheck.recognizor import SYLLABLE_RULES
+    for length, rules in SYLLABLE_RULES.items():
+        for classes, components, checks in rules:
+            assert len(classes) == length
+            assert components is None or len(components) == length
+            assert all(candidate in checker.candidates for candidate in classes)
+    tibetan_match = checker.classify_words([example_syllable])[0]
+    tibetan_att = dict.fromkeys(["原字", "前加字", "上加字", "基字", "下加字", "再下加字", "元音", "后加字", "再后加字"])
+    assert checker.recognize_components(example_syllable, tibetan_match, dict(tibetan_att)) == \
+        checker.recognize_five_components(example_syllable, tibetan_match, dict(tibetan_att))
+    assert len(checker.dispatch) > 0
+
+
+def test_cache():
+    """
+    Test the LRU cache of syllable results.
+    """
+    assert checker.cache_info() is None
+    cached_checker = Checker(cache_size=8)
+    assert cached_checker.check_text(example_text).equals(checker.check_text(example_text))
+    assert cached_checker.recognization_text(example_text).equals(checker.recognization_text(example_text))
+    info = cached_checker.cache_info()
+    assert info.hits > 0 and info.evictions > 0 and info.currsize == 8
+    tibetan_att = cached_checker.recognization_syllable(example_syllable)
+    tibetan_att['基字'] = None
+    assert cached_checker.recognization_syllable(example_syllable) == checker.recognization_syllable(example_syllable)
+    assert cached_checker.check_syllable(example_syllable) == checker.check_syllable(example_syllable)
+    cached_checker.cache_clear()
+    assert cached_checker.cache_info() == (0, 0, 0, 8, 0)
+    with pytest.raises(ValueError):
+        Checker(cache_size=0)
+
+
+def test_analyze():
+    """
+    Test that analyze returns the components and spell check result of recognization_text and check_text.
+    """
+    result = checker.analyze(example_text)
+    components = checker.recognization_text(example_text)
+    check_result = checker.check_text(example_text)
+    assert list(result.columns) == list(components.columns) + ['拼写检查']
+    assert result[components.columns].equals(components)
+    assert result[check_result.columns].equals(check_result)
+    assert checker.analyze(example_text, component_recognization=False, spelling_check=False) is None
+    assert len(checker.analyze('')) == 0
+    with pytest.raises(ValueError):
+        checker.analyze(45)
+
+
+def test_lexicon(tmp_path):
+    """
+    Test the valid-syllable lexicon against the rule-based check.
+    """
+    from BoCheck.bocheck.lexicon import lexicon_mismatches, get_lexicon, load_lexicon
+    path = str(tmp_path / 'lexicon.txt.gz')
+    lexicon = get_lexicon(path)
+    assert load_lexicon(path) == lexicon
+    assert lexicon_mismatches(lexicon, Checker(backend='table')) == []
+    lexicon_checker = Checker(lexicon=path)
+    assert lexicon_checker.check_text(example_text).equals(checker.check_text(example_text))
+    assert lexicon_checker.check_syllable(example_syllable) == checker.check_syllable(example_syllable)
+    (tmp_path / 'stale.txt').write_text('# BoCheck lexicon 0\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_lexicon(str(tmp_path / 'stale.txt'))
+
+
+def test_iter_analyze():
+    """
+    Test that iter_analyze gives the result of analyze in batches.
+    """
+    chunks = [example_text[i:i + 10] for i in range(0, len(example_text), 10)]
+    batches = list(checker.iter_analyze(chunks, batch_size=7))
+    assert all(len(batch) <= 7 for batch in batches)
+    assert pd.concat(batches, ignore_index=True).equals(checker.analyze(example_text))
+    assert list(checker.iter_analyze([''])) == []
+
+
+def test_analyze_offsets():
+    """
+    Test the syllable offsets returned by analyze and iter_analyze.
+    """
+    result = checker.analyze(example_text, offsets=True)
+    assert list(result.columns[-2:]) == ['起始位置', '结束位置']
+    assert result.drop(columns=['起始位置', '结束位置']).equals(checker.analyze(example_text))
+    for syllable, start, end in result[['原字', '起始位置', '结束位置']].values:
+        assert example_text[start:end] == syllable
+    chunks = [example_text[i:i + 10] for i in range(0, len(example_text), 10)]
+    batches = list(checker.iter_analyze(chunks, batch_size=7, offsets=True))
+    assert pd.concat(batches, ignore_index=True).equals(result)
+
+
+def test_shared_checker():
+    """
+    Test that a Checker with a cache gives the same results when shared by several threads.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    text = "ཡང་དེབ་འདི་ནི་ལས་དབང་འཛོམས་པའི་སྐབས་འགན་འཁྲི་ཞིག་ལྡན་པའི་ཐོག་ནས་ཀློག་པ་པོས་ཤོག་ལྷེ་ཕྱེ་ཡི་ཡོད།"
+    expected = Checker().analyze(text, offsets=True)
+    checker = Checker(cache_size=64)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: checker.analyze(text, offsets=True), range(16)))
+    assert all(result.equals(expected) for result in results)
+    assert checker.cache_info().hits > 0
+
+
 if __name__ == "__main__":
     pytest.main()
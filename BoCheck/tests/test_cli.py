@@ -0,0 +1,132 @@
+import io
+import json
+import pytest
+import pandas as pd
+from BoCheck.cli import main
+from BoCheck.process import process_file
+
+# File paths for test documents and directories
+txt_example = "tests/examples/example.txt"
+dir_example = "tests/examples"
+
+
+def read_ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_check(capsys):
+    """Test checking a file, with the results written to stdout as NDJSON."""
+    assert main(['check', txt_example]) == 0
+    rows = read_ndjson(capsys.readouterr().out)
+    result = process_file(txt_example, component_recognization=False, print_result=False)
+    assert [row['原字'] for row in rows] == result['原字'].tolist()
+    assert [row['拼写检查'] for row in rows] == result['拼写检查'].tolist()
+    assert all(row['文件'] == txt_example for row in rows)
+
+
+def test_stdin(capsys, monkeypatch):
+    """Test reading stdin, and keeping only the misspelled syllables."""
+    with open(txt_example, encoding='utf-8') as file:
+        text = file.read()
+    monkeypatch.setattr('sys.stdin', io.StringIO(text))
+    assert main(['analyze', '--errors-only', '--offsets', '--batch-size', '7']) == 0
+    rows = read_ndjson(capsys.readouterr().out)
+    result = process_file(txt_example, print_result=False, offsets=True)
+    errors = result[~result['拼写检查']]
+    assert [(row['原字'], row['起始位置']) for row in rows] == list(zip(errors['原字'], errors['起始位置']))
+    assert '文件' not in rows[0] and not any(row['拼写检查'] for row in rows)
+
+
+def test_output(tmp_path):
+    """Test writing a folder to an output file, with worker processes."""
+    table_path = str(tmp_path / 'result.csv')
+    assert main(['recognize', dir_example, '--errors-only', '-w', '2', '--cache-size', '64', '-o', table_path]) == 0
+    result = pd.read_csv(table_path)
+    assert '拼写检查' not in result.columns and len(result) > 0
+    assert main(['check', txt_example, '-o', table_path, '-f', 'ndjson']) == 0
+    with open(table_path, encoding='utf-8') as file:
+        assert len(read_ndjson(file.read())) == len(process_file(txt_example, print_result=False))
+
+
+def test_errors(capsys):
+    """Test invalid arguments."""
+    assert main(['check', 'missing.txt']) == 2
+    assert 'missing.txt' in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        main(['check', '--workers', '0', txt_example])
+    with pytest.raises(SystemExit):
+        main(['spell', txt_example])
+
+
+def test_shard_merge(tmp_path, capsys):
+    """Test analyzing the shards of a folder and merging their outputs."""
+    table_paths = [str(tmp_path / 'shard{}.ndjson'.format(i)) for i in (1, 2)]
+    for i, table_path in enumerate(table_paths, 1):
+        assert main(['check', dir_example, '--shard', '{}/2'.format(i), '-o', table_path]) == 0
+    summary_path = str(tmp_path / 'summary.json')
+    assert main(['merge'] + table_paths + ['--summary', summary_path]) == 0
+    rows = read_ndjson(capsys.readouterr().out)
+    assert main(['check', dir_example]) == 0
+    assert sorted(map(str, rows)) == sorted(map(str, read_ndjson(capsys.readouterr().out)))
+    with open(summary_path, encoding='utf-8') as file:
+        summary = json.load(file)
+    assert summary['syllables'] == len(rows) and summary['tables'] == 2
+    assert main(['check', dir_example, '--shard', '3/2']) == 2
+
+
+def test_folder_names(capsys):
+    """Test that the files of a folder are named relative to it, wherever it is mounted."""
+    import os
+    names = []
+    for folder, workers in ((dir_example, '1'), (os.path.abspath(dir_example) + os.sep, '2')):
+        assert main(['check', folder, '-w', workers]) == 0
+        names.append(sorted({row['文件'] for row in read_ndjson(capsys.readouterr().out)}))
+    assert names[0] == names[1] == ['example.docx', 'example.txt']
+
+
+def test_archive_input(tmp_path, capsys):
+    """Test that an archive given by itself is looked into like a folder."""
+    import zipfile
+    archive_path = str(tmp_path / 'corpus.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.write(txt_example, 'a.txt')
+        archive.write(txt_example, 'sub/b.txt')
+        archive.writestr('c.csv', 'x')
+    assert main(['check', archive_path]) == 0
+    rows = read_ndjson(capsys.readouterr().out)
+    assert sorted({row['文件'] for row in rows}) == ['corpus.zip!a.txt', 'corpus.zip!sub/b.txt']
+    assert len(rows) == 2 * len(process_file(txt_example, print_result=False))
+    assert main(['check', archive_path, '--exclude', 'corpus.zip!sub/*', '-w', '2']) == 0
+    assert {row['文件'] for row in read_ndjson(capsys.readouterr().out)} == {'corpus.zip!a.txt'}
+    shards = []
+    for i in (1, 2):
+        assert main(['check', archive_path, '--shard', '{}/2'.format(i)]) == 0
+        shards.append({row['文件'] for row in read_ndjson(capsys.readouterr().out)})
+    assert sorted(shards[0] | shards[1]) == sorted({row['文件'] for row in rows}) and not shards[0] & shards[1]
+
+
+def test_merge_clean_files(tmp_path, capsys):
+    """Test that merged files without any row, e.g. without errors, are still counted."""
+    import shutil
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    shutil.copy(txt_example, str(corpus / 'example.txt'))
+    (corpus / 'clean.txt').write_text('ཀ་ཁ་', encoding='utf-8')
+    table_paths = []
+    for i, table_format in ((1, 'ndjson'), (2, 'parquet')):
+        table_paths.append(str(tmp_path / 'shard{}.{}'.format(i, table_format)))
+        assert main(['check', str(corpus), '--errors-only', '--shard', '{}/2'.format(i), '-o', table_paths[-1]]) == 0
+    merged_path = str(tmp_path / 'merged.csv')
+    summary_path = str(tmp_path / 'summary.json')
+    assert main(['merge'] + table_paths + ['-o', merged_path, '--summary', summary_path]) == 0
+    with open(summary_path, encoding='utf-8') as file:
+        summary = json.load(file)
+    assert summary['files'] == 2 and summary['duplicate_files'] == 0
+    assert set(pd.read_csv(merged_path)['文件']) == {'example.txt'}
+    assert main(['merge', merged_path, '--summary', summary_path]) == 0
+    with open(summary_path, encoding='utf-8') as file:
+        assert json.load(file)['files'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,5 +1,8 @@
+import os
 import pytest
-from BoCheck.load import load_file, load_dir, read_docx, read_txt
+from BoCheck.manifest import get_file_hash
+from BoCheck.load import load_file, load_dir, read_docx, read_txt, stream_file, iter_dir, iter_files, iter_docx, \
+    get_file_size, read_file
 
 # File paths for test documents and directories
 docx_example = "tests/examples/example.docx"
@@ -12,7 +15,7 @@ def test_read_docx():
     """Test reading content from a DOCX file."""
     text = read_docx(docx_example)
     assert text == (
-        '              ༄༅།།ཞི་ཅིན་ཕིང་གིས་ཏི་ས་ནཱ་ཡ་ཁེས་སི་རི་ལན་ཁའི་ཙུང་ཐུང་གི་འགན་བཞེས་པར་རྟེན་འབྲེལ་གློག་འཕྲིན་བཏང་གནང་བ།གསར་འགྱུར་སྤེལ་དུས། \u3000【2024ལོའི་ཟླ་ 09ཚེས་25ཉིན། 14:21】\xa0\xa0ཡོང་ཁུངས།：མི་དམངས་ཉིན་རེའི་ཚགས་པར།\xa0（རྩོམ་སྒྲིག་འགན་འཁུར་པ། མཁའ་འགྲོ།）\xa0'
+        '              ༄༅།།ཞི་ཅིན་ཕིང་གིས་ཏི་ས་ནཱ་ཡ་ཁེས་སི་རི་ལན་ཁའི་ཙུང་ཐུང་གི་འགན་བཞེས་པར་རྟེན་འབྲེལ་གློག་འཕྲིན་བཏང་གནང་བ།\nགསར་འགྱུར་སྤེལ་དུས། \u3000【2024ལོའི་ཟླ་ 09ཚེས་25ཉིན། 14:21】\xa0\xa0ཡོང་ཁུངས།：མི་དམངས་ཉིན་རེའི་ཚགས་པར།\xa0（རྩོམ་སྒྲིག་འགན་འཁུར་པ། མཁའ་འགྲོ།）\n\xa0\n\n'
     )
 
 def test_read_txt():
@@ -27,7 +30,7 @@ def test_load_file():
     # Test DOCX file loading
     text = load_file(docx_example)
     assert text == (
-        '              ༄༅།།ཞི་ཅིན་ཕིང་གིས་ཏི་ས་ནཱ་ཡ་ཁེས་སི་རི་ལན་ཁའི་ཙུང་ཐུང་གི་འགན་བཞེས་པར་རྟེན་འབྲེལ་གློག་འཕྲིན་བཏང་གནང་བ།གསར་འགྱུར་སྤེལ་དུས། \u3000【2024ལོའི་ཟླ་ 09ཚེས་25ཉིན། 14:21】\xa0\xa0ཡོང་ཁུངས།：མི་དམངས་ཉིན་རེའི་ཚགས་པར།\xa0（རྩོམ་སྒྲིག་འགན་འཁུར་པ། མཁའ་འགྲོ།）\xa0'
+        '              ༄༅།།ཞི་ཅིན་ཕིང་གིས་ཏི་ས་ནཱ་ཡ་ཁེས་སི་རི་ལན་ཁའི་ཙུང་ཐུང་གི་འགན་བཞེས་པར་རྟེན་འབྲེལ་གློག་འཕྲིན་བཏང་གནང་བ།\nགསར་འགྱུར་སྤེལ་དུས། \u3000【2024ལོའི་ཟླ་ 09ཚེས་25ཉིན། 14:21】\xa0\xa0ཡོང་ཁུངས།：མི་དམངས་ཉིན་རེའི་ཚགས་པར།\xa0（རྩོམ་སྒྲིག་འགན་འཁུར་པ། མཁའ་འགྲོ།）\n\xa0\n\n'
     )
     # Test TXT file loading
     text = load_file(txt_example)
@@ -42,6 +45,59 @@ def test_load_dir():
     assert isinstance(texts, dict)
     assert len(texts) > 0
 
+def test_stream_file():
+    """Test loading files lazily as text chunks."""
+    assert ''.join(stream_file(txt_example, chunk_size=7)) == read_txt(txt_example)
+    assert ''.join(stream_file(docx_example)) == read_docx(docx_example)
+    with pytest.raises(ValueError):
+        stream_file("abc")
+
+def test_iter_dir(tmp_path):
+    """Test loading a folder lazily and recursively, with file selection."""
+    (tmp_path / 'sub' / 'skip').mkdir(parents=True)
+    (tmp_path / 'a.txt').write_text('ཀ་', encoding='utf-8')
+    (tmp_path / 'notes.md').write_text('x', encoding='utf-8')
+    (tmp_path / 'sub' / 'b.txt').write_text('ཁ་', encoding='utf-8')
+    (tmp_path / 'sub' / 'skip' / 'c.txt').write_text('ག་', encoding='utf-8')
+    names = lambda paths: [os.path.relpath(path, tmp_path).replace(os.sep, '/') for path in paths]
+    assert names(iter_files(str(tmp_path))) == ['a.txt', 'sub/b.txt', 'sub/skip/c.txt']
+    assert names(iter_files(str(tmp_path), recursive=False)) == ['a.txt']
+    assert names(iter_files(str(tmp_path), exclude=['skip'])) == ['a.txt', 'sub/b.txt']
+    assert names(iter_files(str(tmp_path), include=['b.*'])) == ['sub/b.txt']
+    assert names(iter_files(str(tmp_path), include=['sub/skip/*'])) == ['sub/skip/c.txt']
+    assert names(iter_files(str(tmp_path), extensions=None, include='*.md')) == ['notes.md']
+    texts = iter_dir(str(tmp_path))
+    assert next(texts)[1] == 'ཀ་'
+    assert ''.join(dict(iter_dir(str(tmp_path), stream=True))[str(tmp_path / 'sub' / 'b.txt')]) == 'ཁ་'
+    assert len(load_dir(str(tmp_path))) == 3
+
+def test_iter_docx(tmp_path):
+    """Test reading the paragraphs of a DOCX file without python-docx, including tables, tabs and breaks."""
+    import zipfile
+    assert '\n'.join(iter_docx(docx_example)) == read_docx(docx_example)
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+                '<w:p><w:r><w:t>ཀ་</w:t><w:tab/><w:t>ཁ</w:t></w:r></w:p>'
+                '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>ག</w:t><w:br/><w:t>ང</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+                '</w:body></w:document>')
+    docx_path = str(tmp_path / 'table.docx')
+    with zipfile.ZipFile(docx_path, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+    assert list(iter_docx(docx_path)) == ['ཀ་\tཁ', 'ག\nང']
+    # A text box is left out, both its first choice and its fallback
+    text_box = '<w:txbxContent><w:p><w:r><w:t>ཁ་</w:t></w:r></w:p></w:txbxContent>'
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+                'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"><w:body>'
+                '<w:p><w:r><w:t>ཀ་</w:t></w:r><w:r><mc:AlternateContent><mc:Choice>' + text_box +
+                '</mc:Choice><mc:Fallback>' + text_box + '</mc:Fallback></mc:AlternateContent></w:r>'
+                '<w:r><w:t>ག</w:t></w:r></w:p>'
+                '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>ང་</w:t></w:r></w:p>'
+                '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>ཅ</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+                '</w:tc></w:tr></w:tbl><w:p/></w:body></w:document>')
+    docx_path = str(tmp_path / 'text_box.docx')
+    with zipfile.ZipFile(docx_path, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+    assert list(iter_docx(docx_path)) == ['ཀ་ག', 'ང་', 'ཅ', '']
+
 def test_read_docx_errors():
     """Test error handling for read_docx with invalid input types."""
     with pytest.raises(ValueError):
@@ -68,5 +124,103 @@ def test_load_dir_errors():
         load_dir("abc")
 
         
+def test_iter_txt_mmap(tmp_path):
+    """Test reading a TXT file, and byte ranges of it, through a memory map."""
+    from BoCheck.utils.file import iter_txt_mmap
+    from BoCheck.utils.tokenize import split_byte_shards
+    text = read_txt(txt_example)
+    assert ''.join(iter_txt_mmap(txt_example, chunk_size=5)) == text
+    with open(txt_example, 'rb') as file:
+        data = file.read()
+    for shards in (1, 3, 8):
+        ranges = split_byte_shards(data, shards)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        assert ''.join(''.join(iter_txt_mmap(txt_example, start, end)) for start, end in ranges) == text
+    # Ranges cut inside a character are moved to the next character
+    first = data.index('༄'.encode('utf-8'))
+    assert ''.join(iter_txt_mmap(txt_example, first + 1, first + 2)) == ''
+    assert ''.join(iter_txt_mmap(txt_example, 0, first + 1)) + ''.join(iter_txt_mmap(txt_example, first + 1)) == text
+    empty_path = str(tmp_path / 'empty.txt')
+    open(empty_path, 'w').close()
+    assert list(iter_txt_mmap(empty_path)) == []
+    with pytest.raises(ValueError):
+        list(iter_txt_mmap("abc"))
+
+
+def test_compressed_and_archives(tmp_path):
+    """Test loading compressed files and members of archives without extracting them."""
+    import gzip, lzma, tarfile, zipfile
+    with open(txt_example, 'rb') as file:
+        data = file.read()
+    with open(docx_example, 'rb') as file:
+        docx_data = file.read()
+    with gzip.open(str(tmp_path / 'a.txt.gz'), 'wb') as file:
+        file.write(data)
+    with lzma.open(str(tmp_path / 'b.txt.xz'), 'wb') as file:
+        file.write(data)
+    with zipfile.ZipFile(str(tmp_path / 'corpus.zip'), 'w') as archive:
+        archive.writestr('sub/c.txt', data)
+        archive.writestr('sub/d.docx', docx_data)
+        archive.writestr('sub/e.csv', 'x')
+    with tarfile.open(str(tmp_path / 'corpus.tar.gz'), 'w:gz') as archive:
+        archive.add(txt_example, 'f.txt')
+    text = read_txt(txt_example)
+    files = list(iter_files(str(tmp_path)))
+    assert [os.path.relpath(file_path, str(tmp_path)) for file_path in files] == [
+        'a.txt.gz', 'b.txt.xz', 'corpus.tar.gz!f.txt', 'corpus.zip!sub/c.txt', 'corpus.zip!sub/d.docx']
+    for file_path in files:
+        expected = read_docx(docx_example) if file_path.endswith('.docx') else text
+        assert load_file(file_path) == expected
+        assert ''.join(stream_file(file_path, chunk_size=7)) == expected
+        assert read_file(file_path) == (expected, get_file_hash(file_path))
+    assert [get_file_size(file_path) for file_path in files[2:]] == [len(data), len(data), len(docx_data)]
+    assert list(iter_files(str(tmp_path), archives=False)) == files[:2]
+    assert len(list(iter_files(str(tmp_path), exclude=['corpus.zip!sub/*']))) == 3
+    assert load_dir(str(tmp_path)).keys() == set(files)
+    with pytest.raises(ValueError):
+        load_file(str(tmp_path / 'corpus.zip!missing.txt'))
+    with pytest.raises(ValueError):
+        stream_file(str(tmp_path / 'corpus.zip!sub/e.csv'))
+
+
+def test_iter_files_shard():
+    """Test that the shards of a folder split its files, the same way on every run."""
+    files = list(iter_files(dir_example))
+    shards = [list(iter_files(dir_example, shard='{}/3'.format(i))) for i in (1, 2, 3)]
+    assert sorted(sum(shards, [])) == sorted(files)
+    assert list(iter_files(dir_example, shard=(2, 3))) == shards[1]
+    assert list(iter_files(dir_example, shard='1/1')) == files
+    for shard in ('0/3', '4/3', '1', 'a/b'):
+        with pytest.raises(ValueError):
+            list(iter_files(dir_example, shard=shard))
+
+
+def test_archive_kept_open(tmp_path):
+    """Test that an archive is opened once for its members, and again once it changes."""
+    import io, tarfile
+    from BoCheck.load import archive_cache, list_members
+    archive_path = str(tmp_path / 'corpus.tar.gz')
+
+    def write_archive(text):
+        with tarfile.open(archive_path, 'w:gz') as archive:
+            for name in ('b.txt', 'a.txt'):
+                data = text.encode('utf-8')
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+    write_archive('ཀ་')
+    assert list_members(archive_path) == ['b.txt', 'a.txt']
+    files = list(iter_files(str(tmp_path)))
+    assert [file_path.rsplit('!', 1)[1] for file_path in files] == ['b.txt', 'a.txt']
+    archive = archive_cache[os.path.abspath(archive_path)][1]
+    assert [load_file(file_path) for file_path in files] == ['ཀ་', 'ཀ་']
+    assert archive_cache[os.path.abspath(archive_path)][1] is archive
+    os.remove(archive_path)
+    write_archive('ཁ་ག་')
+    os.utime(archive_path, ns=(0, 0))
+    assert load_file(files[0]) == 'ཁ་ག་'
+
+
 if __name__ == "__main__":
     pytest.main()
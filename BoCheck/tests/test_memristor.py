@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from BoCheck.memristor.memristor import memristor
+from BoCheck.memristor.memristor import memristor, to_bits
 
 
 @pytest.fixture
@@ -102,5 +102,34 @@ def test_read_array(memristor_instance):
     
     assert np.allclose(result, expected_result)
 
+def test_read_array_batch(memristor_instance):
+    """
+    Test that a batched read gives the same currents as reading each code on its own.
+    """
+    array = memristor_instance.crossbar()
+    word_code_list = ['11001100', '10101010', '11110000', '00001111']
+    array = memristor_instance.write_array(array, word_code_list)
+
+    codes = ['11001100', '00001111', '01010101']
+    result = memristor_instance.read_array_batch(codes, array)
+    assert result.shape == (3, 50)
+    for i, code in enumerate(codes):
+        assert (result[i] == memristor_instance.read_array(code, array)).all()
+
+
+def test_write_array_bits(memristor_instance):
+    """
+    Test that codes given as bit arrays are written and read the same as string codes.
+    """
+    word_code_list = ['11001100', '10101010', '11110000']
+    bits = to_bits(word_code_list)
+    assert bits.shape == (3, 8)
+    assert (bits[0] == [1, 1, 0, 0, 1, 1, 0, 0]).all()
+    
+    array = memristor_instance.write_array(memristor_instance.crossbar(), bits)
+    assert (array == memristor_instance.write_array(memristor_instance.crossbar(), word_code_list)).all()
+    assert (memristor_instance.read_array(bits[1], array) == memristor_instance.read_array('10101010', array)).all()
+
+
 if __name__ == '__main__':
     pytest.main()
@@ -1,7 +1,11 @@
 import pytest
-from BoCheck.save import to_table
+from BoCheck.save import to_table, ExcelSink, open_sink, CsvSink, JsonlSink
+from BoCheck.process import process_dir
 from BoCheck.process import process_file
 import os
+import gzip
+import json
+import pandas as pd
 
 # File path for the test DOCX document
 docx_example = "tests/examples/example.docx"
@@ -76,6 +80,78 @@ def test_invalid_paths_for_to_table(setup_result):
     with pytest.raises(OSError):
         to_table(result, '/non_existent_dir/test_output.xlsx')
 
+def test_excel_sink(setup_result, tmp_path):
+    """Test streaming results into one workbook, with continuation sheets for long results."""
+    result = setup_result
+    output_file = str(tmp_path / 'test_output.xlsx')
+    with ExcelSink(output_file, max_rows=21) as sink:
+        sink.write(result, 'a/b:c.docx')
+        sink.write(result.head(5), 'short.txt')
+        sink.write(result, 'a/b:c.docx')
+    sheets = pd.read_excel(output_file, sheet_name=None)
+    assert list(sheets)[:2] == ['a_b_c.docx', 'a_b_c.docx (2)']
+    assert 'short.txt' in sheets
+    rows = pd.concat([sheet for name, sheet in sheets.items() if name.startswith('a_b_c')], ignore_index=True)
+    assert len(rows) == 2 * len(result)
+    assert list(rows.columns) == list(result.columns)
+    assert rows['原字'].tolist() == result['原字'].tolist() * 2
+
+def test_process_dir_table(tmp_path):
+    """Test writing the results of a directory into one workbook."""
+    output_file = str(tmp_path / 'test_output.xlsx')
+    results = process_dir("tests/examples", table_path=output_file, print_result=False)
+    sheets = pd.read_excel(output_file, sheet_name=None)
+    assert sorted(sheets) == sorted(results)
+    for filename, result in results.items():
+        assert sheets[filename]['原字'].tolist() == result['原字'].tolist()
+
+def test_text_sinks(setup_result, tmp_path):
+    """Test streaming results into CSV and JSON Lines files, plain or gzip compressed."""
+    result = setup_result
+    for filename in ('out.csv', 'out.csv.gz', 'out.jsonl', 'out.ndjson.gz'):
+        output_file = str(tmp_path / filename)
+        with open_sink(output_file) as sink:
+            sink.write(result.head(3), 'a.txt')
+            sink.write(result.iloc[3:], 'a.txt')
+            with pytest.raises(ValueError):
+                sink.write(result[['原字']], 'b.txt')
+        if '.csv' in filename:
+            table = pd.read_csv(output_file, encoding='utf-8-sig')
+        else:
+            table = pd.read_json(output_file, lines=True)
+        assert list(table.columns) == ['文件'] + list(result.columns)
+        assert table['原字'].tolist() == result['原字'].tolist()
+        assert table['拼写检查'].tolist() == result['拼写检查'].tolist()
+    with gzip.open(str(tmp_path / 'out.ndjson.gz'), 'rt', encoding='utf-8') as file:
+        row = json.loads(file.readline())
+    assert row['原字'] == result['原字'][0] and row['前加字'] is None
+
+def test_open_sink_errors(tmp_path):
+    """Test invalid output formats for open_sink."""
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / 'out.pdf'))
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / 'out.xlsx.gz'))
+    with pytest.raises(ValueError):
+        CsvSink(123)
+
+def test_parquet_sink(setup_result, tmp_path):
+    """Test streaming results into a Parquet file."""
+    pytest.importorskip('pyarrow')
+    result = setup_result
+    output_file = str(tmp_path / 'out.parquet')
+    with open_sink(output_file) as sink:
+        sink.write(result.head(3), 'a.txt')
+        sink.write(result.iloc[3:], 'a.txt')
+    table = pd.read_parquet(output_file)
+    assert table['原字'].tolist() == result['原字'].tolist()
+
+def test_process_file_sink(tmp_path):
+    """Test writing the result of a file as JSON Lines."""
+    output_file = str(tmp_path / 'out.jsonl')
+    result = process_file(docx_example, table_path=output_file, print_result=False)
+    assert pd.read_json(output_file, lines=True)['原字'].tolist() == result['原字'].tolist()
+
 def test_empty_result_to_table():
     """Test handling of empty results in to_table function."""
     empty_result = []
@@ -86,5 +162,84 @@ def test_empty_result_to_table():
         to_table(empty_result, 'test_output.csv')
 
         
+def test_sink_atomic(tmp_path):
+    """Test that a sink only replaces its output file once it is closed without error."""
+    df = pd.DataFrame({'a': [1, 2]})
+    for name in ('result.csv', 'result.jsonl.gz', 'result.xlsx'):
+        file_path = str(tmp_path / name)
+        with open(file_path, 'w') as file:
+            file.write('old')
+        with pytest.raises(RuntimeError):
+            with open_sink(file_path) as sink:
+                sink.write(df)
+                raise RuntimeError
+        with open(file_path) as file:
+            assert file.read() == 'old'
+        with open_sink(file_path) as sink:
+            sink.write(df)
+            assert os.path.isfile(file_path + '.part') or name.endswith('.xlsx')
+        assert not os.path.isfile(file_path + '.part')
+        assert os.path.getsize(file_path) > 3
+
+
+def test_parquet_sink_empty_first(tmp_path):
+    """Test that an empty first result does not fix the Parquet column types of the later ones."""
+    pytest.importorskip('pyarrow')
+    import shutil
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    (corpus / '0empty.txt').write_text('')
+    shutil.copy('tests/examples/example.txt', str(corpus / 'text.txt'))
+    output_file = str(tmp_path / 'x.parquet')
+    results = process_dir(str(corpus), table_path=output_file, print_result=False)
+    table = pd.read_parquet(output_file)
+    assert table['原字'].tolist() == results['text.txt']['原字'].tolist()
+    assert table['拼写检查'].dtype == bool
+
+def test_to_table_formats(setup_result, tmp_path):
+    """Test that to_table saves every format open_sink writes."""
+    from BoCheck.utils.sink import TableSink
+    result = setup_result
+    output_file = str(tmp_path / 'out.jsonl.gz')
+    assert to_table(result, output_file)
+    assert pd.read_json(output_file, lines=True)['原字'].tolist() == result['原字'].tolist()
+    assert to_table(result, str(tmp_path / 'out.csv'), sheet_name='result')
+    assert list(pd.read_excel(str(tmp_path / 'out.xlsx'), sheet_name=None)) == ['result']
+    with pytest.raises(TypeError):
+        TableSink(str(tmp_path / 'out.txt'))
+
+
+def test_excel_sink_many_sheets(tmp_path):
+    """Test that a workbook of more sheets than the process can open files is written."""
+    resource = pytest.importorskip('resource')
+    df = pd.DataFrame({'a': [1, 2]})
+    output_file = str(tmp_path / 'many.xlsx')
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    limit = len(os.listdir('/dev/fd')) + 32
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+    try:
+        with ExcelSink(output_file) as sink:
+            for i in range(limit + 50):
+                sink.write(df, 'file{}.txt'.format(i))
+            sink.write(df, 'file0.txt')
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    sheets = pd.read_excel(output_file, sheet_name=None)
+    assert len(sheets) == limit + 50
+    assert sheets['file0.txt']['a'].tolist() == [1, 2, 1, 2]
+
+
+def test_parquet_sink_empty(tmp_path):
+    """Test that an empty input still gives a Parquet file, holding an empty table."""
+    pytest.importorskip('pyarrow')
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    output_file = str(tmp_path / 'x.parquet')
+    assert process_dir(str(corpus), table_path=output_file, print_result=False) == {}
+    table = pd.read_parquet(output_file)
+    assert len(table) == 0 and '拼写检查' in table.columns
+    assert not os.path.isfile(output_file + '.part')
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -1,7 +1,9 @@
 import pytest
 from BoCheck.tokenize import punctuation_split_sentence, space_split_sentence, \
                           split_word, split_number, split_auxiliary, \
-                          convert_sanskrit
+                          convert_sanskrit, iter_syllables, iter_syllables_stream, \
+                          iter_syllable_spans, iter_syllable_spans_stream, split_shards
+from BoCheck.clean import only_tibetan_clean
 
 
 example_text = '༄༅།།ཞི་ཅིན་ཕིང་གིས་ཏི་ས་ནཱ་ཡ་ཁེས་སི་རི་ལན་ཁའི་ཙུང་ཐུང་གི་འགན་བཞེས་པར་རྟེན་འབྲེལ་གློག་འཕྲིན་བཏང་གནང་བ།གསར་འགྱུར་སྤེལ་དུས།ལོའི་ཟླ་ཚེས་ཉིན།ཡོང་ཁུངས།མི་དམངས་ཉིན་རེའི་ཚགས་པར།རྩོམ་སྒྲིག་འགན་འཁུར་པ།མཁའ་འགྲོ།'
@@ -61,5 +63,78 @@ def test_convert_sanskrit_errors():
         convert_sanskrit([1, 2, 3])
         
         
+def test_iter_syllables():
+    """
+    Test that iter_syllables gives the syllables of the clean and split functions.
+    """
+    text = only_tibetan_clean(example_text + '\n༄༅ abc ཀ་༡༢ཁ༎ག༌ང།【༣】')
+    word_list = []
+    for sentence in punctuation_split_sentence(text):
+        word_list.extend(word for word in split_number(split_word(sentence)) if len(word))
+    assert list(iter_syllables(example_text + '\n༄༅ abc ཀ་༡༢ཁ༎ག༌ང།【༣】')) == word_list
+    assert '༡' in word_list and '༣' in word_list
+    assert list(iter_syllables('')) == []
+    with pytest.raises(ValueError):
+        list(iter_syllables(45))
+
+
+def test_iter_syllables_stream():
+    """
+    Test that iter_syllables_stream gives the syllables of iter_syllables across chunk boundaries.
+    """
+    import io
+    syllables = list(iter_syllables(example_text))
+    for chunk_size in (1, 2, 5, 64):
+        assert list(iter_syllables_stream(io.StringIO(example_text), chunk_size)) == syllables
+    chunks = [example_text[i:i + 3] for i in range(0, len(example_text), 3)]
+    assert list(iter_syllables_stream(chunks)) == syllables
+    with pytest.raises(ValueError):
+        list(iter_syllables_stream([b'abc']))
+
+
+def test_iter_syllable_spans():
+    """
+    Test that iter_syllable_spans gives the position of every syllable in the original text.
+    """
+    text = 'ཀ་ a ཁ\nག།༡༢ཀ abc'
+    spans = list(iter_syllable_spans(text))
+    assert [span[0] for span in spans] == list(iter_syllables(text))
+    assert spans == [('ཀ', 0, 1), ('ཁག', 5, 8), ('༡', 9, 10), ('༢', 10, 11)]
+    assert list(iter_syllable_spans(text, 2, 8)) == [('ཁག', 5, 8)]
+    chunks = [text[i:i + 2] for i in range(0, len(text), 2)]
+    assert list(iter_syllable_spans_stream(chunks)) == spans
+
+
+def test_split_shards():
+    """
+    Test that split_shards cuts a text after shads into ranges covering the whole text.
+    """
+    shards = split_shards(example_text, 4)
+    assert len(shards) == 4
+    assert shards[0][0] == 0 and shards[-1][1] == len(example_text)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(shards, shards[1:]))
+    assert all(example_text[end - 1] == '།' for _, end in shards[:-1])
+    syllables = [syllable for start, end in shards for syllable in iter_syllables(example_text[start:end])]
+    assert syllables == list(iter_syllables(example_text))
+    assert split_shards('', 3) == [(0, 0)]
+    assert split_shards('ཀ་ཁ', 3) == [(0, 3)]
+
+
+def test_stream_without_delimiters():
+    """
+    Test that a stream without any delimiter is carried over in bounded pieces, read in linear time.
+    """
+    from BoCheck.utils.tokenize import MAX_CARRY
+    text = 'ཀ' * (MAX_CARRY * 3)
+    chunks = [text[i:i + 1000] for i in range(0, len(text), 1000)]
+    syllables = list(iter_syllables_stream(chunks))
+    assert ''.join(syllables) == text
+    assert max(map(len, syllables)) <= MAX_CARRY + 1000
+    spans = list(iter_syllable_spans_stream(chunks))
+    assert [span[0] for span in spans] == syllables
+    assert all(text[start:end] == word for word, start, end in spans)
+    assert list(iter_syllables_stream(['ཀ་ཁ', 'ག་'])) == ['ཀ', 'ཁག']
+
+
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
@@ -1,6 +1,21 @@
+import codecs
+import io
+import mmap
 import os
+import zipfile
+from xml.etree import ElementTree
 import pandas as pd
-from docx import Document
+from .sink import open_sink, ExcelSink
+
+
+# Namespace of the WordprocessingML elements of a .docx document
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Elements whose paragraphs are read: the body of the document and the cells of its tables
+PARAGRAPH_PARENTS = (WORD_NAMESPACE + 'body', WORD_NAMESPACE + 'tc')
+# Elements left out with their paragraphs: text boxes, and the fallback content of the
+# markup-compatibility alternatives, which repeats the content of their first choice
+SKIPPED_ELEMENTS = (WORD_NAMESPACE + 'txbxContent',
+                    '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback')
 
 
 def get_file_extension(filename: str) -> str:
@@ -40,40 +55,159 @@ def read_txt(file_path: str) -> str:
     return text
 
 
-def read_docx(file_path: str) -> str:
+def iter_txt(file_path: str, chunk_size: int = 1 << 20):
     """
-    Reads the contents of a text file and returns it as a string.
+    Reads the contents of a text file lazily, in chunks of characters.
 
     Parameters:
         file_path (str): The path to the text file to be read.
+        chunk_size (int): Number of characters in each chunk.
 
     Returns:
-        str: The contents of the text file.
+        Iterator[str]: The contents of the text file, chunk by chunk.
     """
     if type(file_path) != str:
         raise ValueError("\"{}\" is not a file, please input a file path or file path.".format(file_path))
     if not os.path.isfile(file_path):  
         raise ValueError("\"{}\" is not a file, please input a file path.".format(file_path))
-    doc = Document(file_path)
-     
-    text = []
-    for paragraph in doc.paragraphs:
-        text.append(paragraph.text)
-    text = ''.join(text)
-    return text
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for chunk in iter(lambda: file.read(chunk_size), ''):
+            yield chunk
+
+
+def iter_txt_mmap(file_path: str, start: int = 0, end=None, chunk_size: int = 1 << 20):
+    """
+    Reads the contents of a text file lazily through a memory map, decoding `chunk_size` bytes at
+    a time, so that only the chunk being decoded is held as a string and the first chunk is ready
+    without reading the rest of the file. Line endings are translated to '\n' as by read_txt().
+
+    A byte range of the file can be read, so that the ranges of a file, e.g. from
+    split_byte_shards(), can be read independently. `start` and `end` are moved forward to the next
+    character boundary, so consecutive ranges read each character once. A range should not end
+    between '\r' and '\n', which would be read as two line endings; ranges ending after a shad
+    never do.
+
+    Parameters:
+        file_path (str): The path to the text file to be read.
+        start (int): Byte offset to start reading at.
+        end (int): Byte offset to stop reading at, None for the end of the file.
+        chunk_size (int): Number of bytes decoded at a time.
+
+    Returns:
+        Iterator[str]: The contents of the byte range, chunk by chunk.
+    """
+    if type(file_path) != str:
+        raise ValueError("\"{}\" is not a file, please input a file path or file path.".format(file_path))
+    if not os.path.isfile(file_path):  
+        raise ValueError("\"{}\" is not a file, please input a file path.".format(file_path))
+    with open(file_path, 'rb') as file:
+        # An empty file cannot be memory-mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = align_utf8(data, start)
+            end = align_utf8(data, len(data) if end is None else end)
+            decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+            for position in range(start, end, chunk_size):
+                text = decoder.decode(data[position:min(position + chunk_size, end)])
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+
+
+def align_utf8(data, position: int) -> int:
+    """
+    Moves a byte offset of UTF-8 encoded data forward to the start of the next character.
+
+    Parameters:
+        data (bytes or mmap): UTF-8 encoded data.
+        position (int): Byte offset.
+
+    Returns:
+        int: The offset of the first character starting at or after `position`, or len(data).
+    """
+    position = min(max(position, 0), len(data))
+    # UTF-8 continuation bytes are 0b10xxxxxx
+    while position < len(data) and data[position] & 0xc0 == 0x80:
+        position += 1
+    return position
+
+
+def read_docx(file_path: str) -> str:
+    """
+    Reads the contents of a .docx file and returns it as a string, with one line per paragraph.
+
+    Parameters:
+        file_path (str): The path to the .docx file to be read.
+
+    Returns:
+        str: The contents of the .docx file.
+    """
+    return '\n'.join(iter_docx(file_path))
+
+
+def iter_docx(file_path):
+    """
+    Reads the paragraphs of a .docx file lazily, parsing word/document.xml incrementally and
+    discarding each paragraph once it is read, without python-docx. The paragraphs of the body
+    and of its tables are read, in document order; text boxes are left out.
+
+    Parameters:
+        file_path (str or file): The path to the .docx file to be read, or the file opened in
+                                 binary mode, e.g. a member of an archive.
+
+    Returns:
+        Iterator[str]: The text of each paragraph, with tabs and line breaks as '\t' and '\n'.
+    """
+    if hasattr(file_path, 'read'):
+        # The central directory of a .docx file is at its end, so the file has to be seekable
+        if not file_path.seekable():
+            file_path = io.BytesIO(file_path.read())
+    elif type(file_path) != str:
+        raise ValueError("\"{}\" is not a file, please input a file path or file path.".format(file_path))
+    elif not os.path.isfile(file_path):  
+        raise ValueError("\"{}\" is not a file, please input a file path.".format(file_path))
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document:
+        # Open elements, from the root of the document to the one being parsed
+        parents = []
+        for event, element in ElementTree.iterparse(document, events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag == WORD_NAMESPACE + 'p' and parents and parents[-1].tag in PARAGRAPH_PARENTS:
+                text = []
+                for child in element.iter():
+                    if child.tag == WORD_NAMESPACE + 't':
+                        text.append(child.text or '')
+                    elif child.tag == WORD_NAMESPACE + 'tab':
+                        text.append('\t')
+                    elif child.tag in (WORD_NAMESPACE + 'br', WORD_NAMESPACE + 'cr'):
+                        text.append('\n')
+                yield ''.join(text)
+            elif element.tag not in SKIPPED_ELEMENTS + (WORD_NAMESPACE + 'tbl',):
+                continue
+            # A read paragraph or table is removed from the document to free it, and a skipped
+            # element so that its text is not read as part of the paragraph holding it
+            if parents:
+                parents[-1].remove(element)
 
 
 def to_table(df: pd.DataFrame, file_path: str, sheet_name="Sheet1") -> None:
     """
-    Saves a Pandas DataFrame to a specified file format (CSV or Excel).
+    Saves a Pandas DataFrame to a specified file format, through the sink open_sink() gives for
+    its extension: .xlsx, .csv, .jsonl or .ndjson (optionally followed by .gz) or .parquet.
 
     Parameters:
         df (pd.DataFrame): The DataFrame to be saved.
         file_path (str): The path where the file will be saved (include file extension).
-        file_format (str): The format to save the file in. Choose 'csv' or 'excel'. Defaults to 'csv'.
+        sheet_name (str): Name of the worksheet of an Excel file; a .csv file is saved as .xlsx
+                          when it is not "Sheet1".
 
     Returns:
-        None
+        bool: True once the file is saved.
     """
     if type(df) != pd.DataFrame:
         raise ValueError("\"df\" is not a pd.Dataframe, please input a pd.Dataframe form data.")
@@ -83,20 +217,14 @@ def to_table(df: pd.DataFrame, file_path: str, sheet_name="Sheet1") -> None:
         raise ValueError("\"{}\" is not a file, please input a file path.".format(file_path))
     file_format = get_file_extension(file_path)
     
-    if file_format == '.csv':
-        if sheet_name == "Sheet1":
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
-            return True
+    if file_format == '.csv' and sheet_name != "Sheet1":
+        file_path = file_path[:-3] + 'xlsx'
+    with open_sink(file_path) as sink:
+        if isinstance(sink, ExcelSink):
+            sink.write(df, sheet_name)
         else:
-            file_path = file_path[:-4] + 'xlsx'
-            df.to_excel(file_path, sheet_name=sheet_name, index=False, engine='openpyxl')
-            return True
-    elif file_format == '.xlsx':
-        df.to_excel(file_path, sheet_name=sheet_name, index=False, engine='openpyxl')
-        return True
-    else:
-        raise ValueError("Invalid file format. Please choose 'csv' or 'excel'.")
-        return False
+            sink.write(df)
+    return True
     
     
 def is_file_path(path):
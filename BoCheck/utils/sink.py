@@ -0,0 +1,584 @@
+import abc
+import contextlib
+import csv
+import gzip
+import json
+import os
+import re
+import pandas as pd
+from ..bocheck.checker import COMPONENT_COLUMNS, CHECK_COLUMN, OFFSET_COLUMNS
+
+
+# Column holding the name of each result, e.g. the analyzed file, in sinks writing a single table
+NAME_COLUMN = "文件"
+# Columns of text in results, read back as text even when a chunk of a table has no value in them
+STRING_COLUMNS = COMPONENT_COLUMNS + [NAME_COLUMN]
+# Rows of an Excel worksheet, the first holding the header
+EXCEL_MAX_ROWS = 1048576
+# Characters not allowed in Excel sheet names, and their maximum length
+EXCEL_SHEET_NAME_PATTERN = re.compile(r'[\[\]:*?/\\]')
+EXCEL_SHEET_NAME_LENGTH = 31
+# Suffix of the file a sink writes to until it is closed, when it is renamed to the output path
+PART_SUFFIX = '.part'
+# Suffix of the file listing the names of the results written to a table, including those without
+# any row, e.g. the files without errors when only errors are written
+FILES_SUFFIX = '.files.json'
+
+
+class ExcelSink:
+    """
+    A streaming Excel writer that opens a workbook once and appends results to it as they come,
+    with xlsxwriter's constant memory mode so written rows are flushed to disk instead of being
+    kept in memory. The workbook only replaces the output file once it is complete.
+
+    In constant memory mode each worksheet keeps its rows in a temporary file until the workbook
+    is closed; only the file of the worksheet being written is kept open, so that a workbook of
+    thousands of worksheets does not run out of file descriptors.
+    """
+    def __init__(self, file_path, max_rows=EXCEL_MAX_ROWS):
+        """
+        Creates the workbook.
+
+        Parameters:
+        file_path (str): Path of the .xlsx file to write.
+        max_rows (int): Rows of a worksheet, including the header, beyond which the rows continue
+                        on a new worksheet.
+        """
+        import xlsxwriter
+        if type(file_path) != str:
+            raise ValueError("\"{}\" is not a file, please input a file path or file path.".format(file_path))
+        self.file_path = file_path
+        self.max_rows = max_rows
+        # The part file is created at once, so that an output path that cannot be written to
+        # fails here, as with the other sinks, rather than once every row is written
+        open(file_path + PART_SUFFIX, 'wb').close()
+        self.workbook = xlsxwriter.Workbook(file_path + PART_SUFFIX, {'constant_memory': True})
+        self.header_format = self.workbook.add_format({'bold': True})
+        self.sheet_names = set()
+        self.sheets = {}
+        self.active_sheet = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def sheet_name(self, name):
+        """
+        Turns a name into a valid worksheet name not used yet in the workbook.
+
+        Parameters:
+        name (str): Wanted name, e.g. the name of the analyzed file.
+
+        Returns:
+        str: Name without the characters Excel forbids, shortened to 31 characters and numbered if
+             needed to be unique.
+        """
+        name = EXCEL_SHEET_NAME_PATTERN.sub('_', name).strip("'") or 'Sheet'
+        sheet_name, number = name[:EXCEL_SHEET_NAME_LENGTH], 1
+        while sheet_name.lower() in self.sheet_names:
+            number += 1
+            suffix = ' ({})'.format(number)
+            sheet_name = name[:EXCEL_SHEET_NAME_LENGTH - len(suffix)] + suffix
+        self.sheet_names.add(sheet_name.lower())
+        return sheet_name
+    
+    def add_sheet(self, name, columns):
+        """
+        Adds a worksheet and writes its header.
+
+        Parameters:
+        name (str): Name of the result written to the worksheet.
+        columns (list): Column names of the result.
+
+        Returns:
+        list: The worksheet and the index of its next row.
+        """
+        self.activate(None)
+        worksheet = self.workbook.add_worksheet(self.sheet_name(name))
+        self.active_sheet = worksheet
+        worksheet.write_row(0, 0, columns, self.header_format)
+        return [worksheet, 1]
+    
+    def activate(self, worksheet):
+        """
+        Closes the temporary file of the worksheet written last, and reopens that of a worksheet,
+        as xlsxwriter does for every worksheet when the workbook is closed.
+
+        Parameters:
+        worksheet (Worksheet): Worksheet to write to, or None to only close the last one.
+        """
+        if worksheet is self.active_sheet:
+            return
+        if self.active_sheet is not None:
+            self.active_sheet._opt_close()
+        if worksheet is not None:
+            worksheet._opt_reopen()
+        self.active_sheet = worksheet
+    
+    def write(self, df, name="Sheet1"):
+        """
+        Appends the rows of a result to the worksheet of a name, creating it on the first write
+        and continuing on a new worksheet when it is full.
+
+        Parameters:
+        df (pd.DataFrame): Rows to append.
+        name (str): Name of the result, e.g. the name of the analyzed file.
+        """
+        rows = get_rows(df)
+        columns = list(df.columns)
+        if name not in self.sheets:
+            self.sheets[name] = self.add_sheet(name, columns)
+        sheet = self.sheets[name]
+        self.activate(sheet[0])
+        for row in rows:
+            if sheet[1] == self.max_rows:
+                sheet[:] = self.add_sheet(name, columns)
+            sheet[0].write_row(sheet[1], 0, row)
+            sheet[1] += 1
+    
+    def close(self):
+        """
+        Finishes the workbook file.
+        """
+        if self.workbook is None:
+            return
+        if not self.sheets:
+            self.workbook.add_worksheet()
+        self.workbook.close()
+        self.workbook = None
+        os.replace(self.file_path + PART_SUFFIX, self.file_path)
+    
+    def abort(self):
+        """
+        Stops writing without touching the output file, e.g. when the run fails.
+        """
+        if self.workbook is None:
+            return
+        # Closing the workbook also removes the temporary files of its worksheets
+        if not self.sheets:
+            self.workbook.add_worksheet()
+        self.workbook.close()
+        self.workbook = None
+        remove_part(self.file_path)
+
+
+def get_rows(df):
+    """
+    Converts the rows of a DataFrame to lists of plain Python values, with None for missing values.
+
+    Parameters:
+    df (pd.DataFrame): Rows to convert.
+
+    Returns:
+    list: One list of values per row.
+    """
+    if type(df) != pd.DataFrame:
+        raise ValueError("\"df\" is not a pd.Dataframe, please input a pd.Dataframe form data.")
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+class TableSink(abc.ABC):
+    """
+    Base class of the streaming writers of a single table, to which results are appended as row
+    batches. When a result is written with a name, the name is written in a first "文件" column.
+    A file path is written to only once the sink is closed, so that a run that fails or is
+    interrupted never leaves a partially written output. Subclasses implement write_rows().
+
+    The names of the results written to a file path are also listed in a file next to it, see
+    write_file_list(), so that the results without any row are still known.
+    """
+    def __init__(self, file):
+        """
+        Opens the output.
+
+        Parameters:
+        file (str or file): Path of the file to write, gzip compressed if it ends with '.gz', or
+                            a file object.
+        """
+        if isinstance(file, str):
+            self.file_path = file
+            self.file = self.open(file)
+            self.own_file = True
+        elif hasattr(file, 'write'):
+            self.file = file
+            self.own_file = False
+        else:
+            raise ValueError("\"{}\" is not a file, please input a file path or file object.".format(file))
+        self.columns = None
+        self.names = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def open(self, file_path):
+        """
+        Opens the part file of a file path for writing text, through gzip if it ends with '.gz'.
+
+        Parameters:
+        file_path (str): Path of the file to write.
+
+        Returns:
+        file: The opened text file.
+        """
+        if file_path.endswith('.gz'):
+            return gzip.open(file_path + PART_SUFFIX, 'wt', encoding='utf-8', newline='')
+        return open(file_path + PART_SUFFIX, 'w', encoding='utf-8', newline='')
+    
+    def write(self, df, name=None):
+        """
+        Appends the rows of a result.
+
+        Parameters:
+        df (pd.DataFrame): Rows to append.
+        name (str, optional): Name of the result, e.g. the name of the analyzed file.
+        """
+        rows = get_rows(df)
+        columns = list(df.columns)
+        if name is not None:
+            self.names[name] = None
+            columns = [NAME_COLUMN] + columns
+            rows = [[name] + row for row in rows]
+        if self.columns is None:
+            self.columns = columns
+            self.write_header(columns)
+        elif columns != self.columns:
+            raise ValueError("\"df\" has other columns than the results already written.")
+        self.write_rows(rows)
+        self.file.flush()
+    
+    def write_header(self, columns):
+        """
+        Writes the column names before the first rows, if the format has a header.
+        """
+        pass
+    
+    @abc.abstractmethod
+    def write_rows(self, rows):
+        """
+        Writes rows of plain Python values, in the order of self.columns.
+        """
+    
+    def close(self):
+        """
+        Closes the output file, if it was opened by the sink, and moves it to the output path.
+        """
+        if self.own_file and not self.file.closed:
+            self.file.close()
+            write_file_list(self.file_path, self.names)
+            os.replace(self.file_path + PART_SUFFIX, self.file_path)
+    
+    def add_names(self, names):
+        """
+        Lists names of results along with those written, e.g. of the files of a merged table.
+        """
+        self.names.update(dict.fromkeys(names))
+    
+    def abort(self):
+        """
+        Stops writing without touching the output file, e.g. when the run fails.
+        """
+        if self.own_file and not self.file.closed:
+            self.file.close()
+            remove_part(self.file_path)
+
+
+class CsvSink(TableSink):
+    """
+    A streaming CSV writer.
+    """
+    def open(self, file_path):
+        if file_path.endswith('.gz'):
+            return super().open(file_path)
+        # The byte order mark lets Excel recognize the Tibetan text as UTF-8, as to_table() does
+        return open(file_path + PART_SUFFIX, 'w', encoding='utf-8-sig', newline='')
+    
+    def write_header(self, columns):
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+    
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+
+class JsonlSink(TableSink):
+    """
+    A streaming JSON Lines writer, with one object per row.
+    """
+    def write_rows(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + '\n')
+
+
+class ParquetSink:
+    """
+    A streaming Parquet writer, which needs pyarrow, writing each batch of rows as a row group.
+    When a result is written with a name, the name is written in a first "文件" column. A file
+    path is written to only once the sink is closed, and the names of its results are listed next
+    to it, as by TableSink.
+    """
+    def __init__(self, file):
+        """
+        Opens the output.
+
+        Parameters:
+        file (str or file): Path of the file to write, or a binary file object.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("pyarrow is not installed, please install pyarrow to write Parquet files.")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.file = file
+        self.writer = None
+        self.schema = None
+        self.closed = False
+        self.names = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def get_schema(self, df):
+        """
+        Returns the Arrow schema of a result. The columns of Checker.analyze() results have a fixed
+        type, so that a first batch without any value in a column, e.g. of an empty file, does not
+        give the column a type the later batches do not fit in; other columns get the type of
+        their values in the first batch.
+
+        Parameters:
+        df (pd.DataFrame): First result written.
+
+        Returns:
+        pyarrow.Schema: Boolean, integer, float or string type of each column.
+        """
+        fields = []
+        for column, dtype in df.dtypes.items():
+            if column in COMPONENT_COLUMNS or column == NAME_COLUMN:
+                fields.append(self.pa.field(column, self.pa.string()))
+            elif column == CHECK_COLUMN:
+                fields.append(self.pa.field(column, self.pa.bool_()))
+            elif column in OFFSET_COLUMNS:
+                fields.append(self.pa.field(column, self.pa.int64()))
+            elif pd.api.types.is_bool_dtype(dtype):
+                fields.append(self.pa.field(column, self.pa.bool_()))
+            elif pd.api.types.is_integer_dtype(dtype):
+                fields.append(self.pa.field(column, self.pa.int64()))
+            elif pd.api.types.is_float_dtype(dtype):
+                fields.append(self.pa.field(column, self.pa.float64()))
+            else:
+                fields.append(self.pa.field(column, self.pa.string()))
+        return self.pa.schema(fields)
+    
+    def write(self, df, name=None):
+        """
+        Appends the rows of a result as a row group.
+
+        Parameters:
+        df (pd.DataFrame): Rows to append.
+        name (str, optional): Name of the result, e.g. the name of the analyzed file.
+        """
+        if type(df) != pd.DataFrame:
+            raise ValueError("\"df\" is not a pd.Dataframe, please input a pd.Dataframe form data.")
+        if name is not None:
+            self.names[name] = None
+            df = df.copy()
+            df.insert(0, NAME_COLUMN, name)
+        if self.writer is None:
+            self.open_writer(self.get_schema(df))
+        elif list(df.columns) != self.schema.names:
+            raise ValueError("\"df\" has other columns than the results already written.")
+        self.writer.write_table(self.pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+    
+    def open_writer(self, schema):
+        """
+        Starts writing the Parquet file with a schema.
+
+        Parameters:
+        schema (pyarrow.Schema): Schema of the rows written.
+        """
+        self.schema = schema
+        file = self.file + PART_SUFFIX if isinstance(self.file, str) else self.file
+        self.writer = self.pq.ParquetWriter(file, self.schema)
+    
+    def close(self):
+        """
+        Finishes the Parquet file. When nothing was written, e.g. for an empty folder, the file
+        still holds an empty table, with the columns of Checker.analyze() results, as the other
+        sinks leave an empty table.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.writer is None:
+            self.open_writer(self.get_schema(pd.DataFrame(columns=COMPONENT_COLUMNS + [CHECK_COLUMN])))
+        self.writer.close()
+        self.writer = None
+        if isinstance(self.file, str):
+            write_file_list(self.file, self.names)
+            os.replace(self.file + PART_SUFFIX, self.file)
+    
+    def add_names(self, names):
+        """
+        Lists names of results along with those written, as TableSink.add_names() does.
+        """
+        self.names.update(dict.fromkeys(names))
+    
+    def abort(self):
+        """
+        Stops writing without touching the output file, e.g. when the run fails.
+        """
+        self.closed = True
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            if isinstance(self.file, str):
+                remove_part(self.file)
+
+
+def write_file_list(file_path, names):
+    """
+    Lists the names of the results written to a table in a JSON file next to it, replacing the list
+    of a previous table, once the table is complete.
+
+    Parameters:
+    file_path (str): Path of the table.
+    names (iterable): Names of the results, in the order they were written.
+    """
+    names = list(names)
+    list_path = file_path + FILES_SUFFIX
+    if not names:
+        if os.path.isfile(list_path):
+            os.remove(list_path)
+        return
+    with open(list_path + PART_SUFFIX, 'w', encoding='utf-8') as file:
+        json.dump({'files': names}, file, ensure_ascii=False, indent=1)
+    os.replace(list_path + PART_SUFFIX, list_path)
+
+
+def read_file_list(file_path):
+    """
+    Reads the names of the results of a table listed by write_file_list().
+
+    Parameters:
+    file_path (str): Path of the table.
+
+    Returns:
+    list: Names of the results, or None if the table has no list, e.g. when it was written to stdout.
+    """
+    list_path = file_path + FILES_SUFFIX
+    if not os.path.isfile(list_path):
+        return None
+    with open(list_path, encoding='utf-8') as file:
+        return json.load(file)['files']
+
+
+def remove_part(file_path):
+    """
+    Removes the part file a sink was writing to instead of a file path.
+
+    Parameters:
+    file_path (str): Path of the output file.
+    """
+    if os.path.isfile(file_path + PART_SUFFIX):
+        os.remove(file_path + PART_SUFFIX)
+
+
+# Sink of each output file extension
+SINKS = {'.xlsx': ExcelSink, '.csv': CsvSink, '.jsonl': JsonlSink, '.ndjson': JsonlSink,
+         '.parquet': ParquetSink}
+
+
+def open_sink(file_path):
+    """
+    Opens the streaming writer matching the extension of an output file: .xlsx, .csv, .jsonl or
+    .ndjson (optionally followed by .gz) or .parquet.
+
+    Parameters:
+    file_path (str): Path of the file to write.
+
+    Returns:
+    ExcelSink, CsvSink, JsonlSink or ParquetSink: The opened sink.
+    """
+    extension = get_table_format(file_path)
+    if extension not in SINKS:
+        raise ValueError("Invalid file format. Please choose .xlsx, .csv, .jsonl, .ndjson or .parquet.")
+    return SINKS[extension](file_path)
+
+
+def get_table_format(file_path):
+    """
+    Gives the format of a table file from its extension, ignoring a final .gz.
+
+    Parameters:
+    file_path (str): Path of the table file.
+
+    Returns:
+    str: The extension of the table format, e.g. ".csv" for "result.csv.gz".
+    """
+    if type(file_path) != str:
+        raise ValueError("\"{}\" is not a file, please input a file path or file path.".format(file_path))
+    root, extension = os.path.splitext(file_path)
+    if extension == '.gz':
+        extension = os.path.splitext(root)[1]
+        if extension not in ('.csv', '.jsonl', '.ndjson'):
+            raise ValueError("Invalid file format. Only .csv, .jsonl and .ndjson files can be gzip compressed.")
+    return extension
+
+
+def iter_table(file_path, chunk_size=65536):
+    """
+    Reads a table written by a sink lazily, in chunks of rows: .csv, .jsonl or .ndjson (optionally
+    followed by .gz) or .parquet.
+
+    Parameters:
+    file_path (str): Path of the table file.
+    chunk_size (int): Number of rows in each chunk.
+
+    Returns:
+    Iterator[pd.DataFrame]: The rows of the table, chunk by chunk, the component and file name
+                            columns holding strings, or None for missing values.
+    """
+    extension = get_table_format(file_path)
+    if not os.path.isfile(file_path):
+        raise ValueError("\"{}\" is not a file, please input a file path.".format(file_path))
+    if extension == '.csv':
+        # The byte order mark written by CsvSink is skipped
+        reader = pd.read_csv(file_path, chunksize=chunk_size, encoding='utf-8-sig',
+                             dtype=dict.fromkeys(STRING_COLUMNS, str))
+    elif extension in ('.jsonl', '.ndjson'):
+        reader = pd.read_json(file_path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False)
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("pyarrow is not installed, please install pyarrow to read Parquet files.")
+        reader = (batch.to_pandas() for batch in
+                  pyarrow.parquet.ParquetFile(file_path).iter_batches(batch_size=chunk_size))
+    else:
+        raise ValueError("Invalid file format. Please choose .csv, .jsonl, .ndjson or .parquet.")
+    with contextlib.closing(reader):
+        for chunk in reader:
+            # A column without any value in a chunk is read as float, which the chunks after it,
+            # and the merged table, do not fit in
+            for column in STRING_COLUMNS:
+                if column in chunk.columns:
+                    chunk[column] = chunk[column].astype(object).where(chunk[column].notna(), None)
+            yield chunk
@@ -1,8 +1,26 @@
 import re
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 from ..letters import *
 
 
+# Tibetan sentence (shad) and syllable (tsheg) delimiters, characters outside the Tibetan block, and
+# Tibetan numerals
+SENTENCE_DELIMITERS = '།༎༏༐༑'
+SYLLABLE_DELIMITERS = '་༌'
+SYLLABLE_PATTERN = re.compile('[^' + SENTENCE_DELIMITERS + SYLLABLE_DELIMITERS + ']+')
+SENTENCE_DELIMITER_PATTERN = re.compile('[' + SENTENCE_DELIMITERS + ']')
+SENTENCE_DELIMITER_BYTES_PATTERN = re.compile(b'|'.join(re.escape(delimiter.encode('utf-8'))
+                                                       for delimiter in SENTENCE_DELIMITERS))
+NON_TIBETAN_PATTERN = re.compile('[^\u0f00-\u0fff]+')
+TIBETAN_PATTERN = re.compile('[\u0f00-\u0fff]+')
+NUMBER_PATTERN = re.compile('[' + ''.join(NUMBER) + ']')
+# Number of characters read at a time from a text stream
+CHUNK_SIZE = 1 << 20
+# Number of characters without any delimiter carried over from chunk to chunk of a text stream,
+# beyond which they are split as a syllable so that the memory used stays bounded
+MAX_CARRY = 1 << 16
+
+
 def punctuation_split_sentence(text: str) -> List[str]:
     """
     Splits the text into sentences based on Tibetan punctuation.
@@ -144,4 +162,183 @@ def convert_sanskrit(text: List[str]) -> List[str]:
     for i in range(len(text)):
         if text[i] == 'སིཊ':
             text[i] = 'སིགས'
-    return text
\ No newline at end of file
+    return text
+
+
+def iter_syllables(text: str) -> Iterator[str]:
+    """
+    Yields the syllables of a text in a single scan, giving the same syllables as only_tibetan_clean,
+    punctuation_clean, punctuation_split_sentence, split_word and split_number applied in turn,
+    without the empty ones.
+
+    Parameters:
+    text (str): Input string to split.
+
+    Returns:
+    Iterator[str]: The non-empty syllables of the text, in order.
+    """
+    for word, _, _ in iter_syllable_spans(text):
+        yield word
+
+
+def iter_syllable_spans(text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yields the syllables of a text, as iter_syllables does, with their position in the text. The
+    span of a syllable runs from its first to its last Tibetan character, and characters outside
+    the Tibetan block inside it are not part of the syllable.
+
+    Parameters:
+    text (str): Input string to split.
+    pos (int): Index in the text where splitting starts.
+    endpos (int, optional): Index in the text where splitting ends, the end of the text by default.
+
+    Returns:
+    Iterator[Tuple[str, int, int]]: (syllable, start, end) for each non-empty syllable, in order,
+                                    where text[start:end] holds the syllable.
+    """
+    if type(text) != str: 
+        raise ValueError("\"text\" is not a string, please input a string.")
+    if endpos is None:
+        endpos = len(text)
+    for match in SYLLABLE_PATTERN.finditer(text, pos, endpos):
+        start, end = match.span()
+        if NON_TIBETAN_PATTERN.search(text, start, end):
+            pieces = [piece.span() for piece in TIBETAN_PATTERN.finditer(text, start, end)]
+            if not pieces:
+                continue
+            start, end = pieces[0][0], pieces[-1][1]
+            word = ''.join(text[piece_start:piece_end] for piece_start, piece_end in pieces)
+        else:
+            word = match.group()
+        if len(word) > 1 and NUMBER_PATTERN.search(word):
+            for number in NUMBER_PATTERN.finditer(text, start, end):
+                yield number.group(), number.start(), number.end()
+        else:
+            yield word, start, end
+
+
+def split_shards(text: str, shards: int) -> List[Tuple[int, int]]:
+    """
+    Splits a text into about `shards` consecutive ranges of similar length, each ending right after
+    a sentence delimiter (shad) or at the end of the text. No syllable crosses a shad, so the
+    syllables of the ranges, in order, are the syllables of the text.
+
+    Parameters:
+    text (str): Input string to split.
+    shards (int): Number of ranges wanted.
+
+    Returns:
+    List[Tuple[int, int]]: (start, end) of each range, covering the whole text.
+    """
+    if type(text) != str: 
+        raise ValueError("\"text\" is not a string, please input a string.")
+    if type(shards) != int or shards < 1:
+        raise ValueError("\"shards\" is not a positive integer, please input a positive integer.")
+    bounds = [0]
+    for i in range(1, shards):
+        match = SENTENCE_DELIMITER_PATTERN.search(text, max(len(text) * i // shards, bounds[-1]))
+        if match is None:
+            break
+        if match.end() > bounds[-1]:
+            bounds.append(match.end())
+    if bounds[-1] < len(text) or len(bounds) == 1:
+        bounds.append(len(text))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def split_byte_shards(data, shards: int) -> List[Tuple[int, int]]:
+    """
+    Splits UTF-8 encoded text, such as a memory-mapped file, into about `shards` consecutive byte
+    ranges of similar length, each ending right after a sentence delimiter (shad) or at the end of
+    the data, as split_shards() does for a string. The ranges can be decoded independently.
+
+    Parameters:
+    data (bytes, bytearray or mmap): UTF-8 encoded text to split.
+    shards (int): Number of ranges wanted.
+
+    Returns:
+    List[Tuple[int, int]]: (start, end) byte offsets of each range, covering the whole data.
+    """
+    if type(shards) != int or shards < 1:
+        raise ValueError("\"shards\" is not a positive integer, please input a positive integer.")
+    bounds = [0]
+    for i in range(1, shards):
+        match = SENTENCE_DELIMITER_BYTES_PATTERN.search(data, max(len(data) * i // shards, bounds[-1]))
+        if match is None:
+            break
+        if match.end() > bounds[-1]:
+            bounds.append(match.end())
+    if bounds[-1] < len(data) or len(bounds) == 1:
+        bounds.append(len(data))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_syllables_stream(stream, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yields the syllables of a text stream read in chunks, giving the same syllables as
+    iter_syllables on the whole text. The characters after the last delimiter of a chunk are
+    carried over to the next chunk, so syllables cut at a chunk boundary are yielded whole; only
+    a text running over MAX_CARRY characters without any delimiter is split where it is carried.
+
+    Parameters:
+    stream (file or iterable): Text file object, or iterable of text chunks.
+    chunk_size (int): Number of characters read at a time from a file object.
+
+    Returns:
+    Iterator[str]: The non-empty syllables of the text, in order.
+    """
+    chunks = iter(lambda: stream.read(chunk_size), '') if hasattr(stream, 'read') else stream
+    rest = ''
+    for chunk in chunks:
+        if type(chunk) != str: 
+            raise ValueError("\"stream\" is not a text stream, please input a text stream.")
+        # The carried characters hold no delimiter, so only the new chunk is searched
+        end = max(map(chunk.rfind, SENTENCE_DELIMITERS + SYLLABLE_DELIMITERS)) + 1
+        if end:
+            yield from iter_syllables(rest + chunk[:end])
+            rest, chunk = '', chunk[end:]
+        # Characters outside the Tibetan block are dropped anyway, so only Tibetan ones are carried
+        rest += NON_TIBETAN_PATTERN.sub('', chunk)
+        if len(rest) > MAX_CARRY:
+            yield from iter_syllables(rest)
+            rest = ''
+    yield from iter_syllables(rest)
+
+
+def iter_syllable_spans_stream(stream, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yields the syllables of a text stream read in chunks with their position in the whole text,
+    giving the same spans as iter_syllable_spans on the whole text.
+
+    Parameters:
+    stream (file or iterable): Text file object, or iterable of text chunks.
+    chunk_size (int): Number of characters read at a time from a file object.
+
+    Returns:
+    Iterator[Tuple[str, int, int]]: (syllable, start, end) for each non-empty syllable, in order.
+    """
+    chunks = iter(lambda: stream.read(chunk_size), '') if hasattr(stream, 'read') else stream
+    rest, offset = '', 0
+    for chunk in chunks:
+        if type(chunk) != str: 
+            raise ValueError("\"stream\" is not a text stream, please input a text stream.")
+        # The carried characters hold no delimiter, so only the new chunk is searched
+        end = max(map(chunk.rfind, SENTENCE_DELIMITERS + SYLLABLE_DELIMITERS)) + 1
+        if not end and rest:
+            rest += chunk
+        else:
+            text = rest + chunk
+            if end:
+                end += len(rest)
+                for word, start, stop in iter_syllable_spans(text, 0, end):
+                    yield word, start + offset, stop + offset
+            # Characters outside the Tibetan block before the next syllable are not carried over
+            first = TIBETAN_PATTERN.search(text, end)
+            start = first.start() if first else len(text)
+            rest, offset = text[start:], offset + start
+        if len(rest) > MAX_CARRY:
+            for word, start, stop in iter_syllable_spans(rest):
+                yield word, start + offset, stop + offset
+            rest, offset = '', offset + len(rest)
+    for word, start, stop in iter_syllable_spans(rest):
+        yield word, start + offset, stop + offset
@@ -3,6 +3,13 @@ from typing import List
 from ..letters import *
 
 
+# 8-bit codes of the whole Tibetan Unicode block (U+0F00-U+0FFF), one row per letter id. The extra
+# last row, used for characters outside the block, holds 2 ("no read voltage") and matches nothing.
+TIBETAN_CODE_TABLE = np.vstack([np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1),
+                                np.full([1, 8], 2, dtype=np.uint8)])
+TIBETAN_CODE_TABLE.flags.writeable = False
+
+
 def unicode_to_text(unicode_list):
     """
     Convert a list of Unicode code points to the corresponding text.
@@ -33,7 +40,22 @@ def get_index(var: np.array, val: int) -> int:
         result = 100
     return result
 
-def get_bin(tibetan: str) -> int:
+def get_id(tibetan: str) -> int:
+    """
+    Gets the letter id of a Tibetan character, i.e. its offset in the Tibetan Unicode block.
+    
+    Args:
+        tibetan (str): A Tibetan character.
+    
+    Returns:
+        int: Offset of the character from U+0F00 (0-255), or -1 if it lies outside the block.
+    """
+    letter_id = ord(tibetan) - 0xF00
+    if not 0 <= letter_id < 256:
+        letter_id = -1
+    return letter_id
+
+def get_bin(tibetan: str) -> np.ndarray:
     """
     Converts a Tibetan character to its binary representation.
     
@@ -41,28 +63,25 @@ def get_bin(tibetan: str) -> int:
         tibetan (str): A Tibetan character.
     
     Returns:
-        str: Binary representation of the character's Unicode code point.
+        np.ndarray: The 8 low bits of the character's Unicode code point, as a uint8 array.
     """
-    unicode = tibetan.encode("unicode_escape")
-    encoding = unicode.decode('utf-8')
-    encoding = encoding.replace('\\u', '')
-    encoding = bin(int(encoding, 16)).replace('0b1111', '')
-    return encoding
+    return TIBETAN_CODE_TABLE[get_id(tibetan)]
 
-def get_bin_list(tibetan_list: List[str]) -> List[int]:
+def get_bin_list(tibetan_list: List[str]) -> np.ndarray:
     """
-    Converts a list of Tibetan characters into their binary representations.
+    Converts a list of Tibetan characters, or a string, into their binary representations.
     
     Args:
         tibetan_list (list of str): List of Tibetan characters.
     
     Returns:
-        list of str: List of binary representations for each character.
+        np.ndarray: (N, 8) uint8 array with the binary representation of each character.
     """
-    tibetan_list_code = []
-    for letter in tibetan_list:
-        tibetan_list_code.append(get_bin(letter))
-    return tibetan_list_code
+    # Lone surrogates are encoded as their code point, which is outside the Tibetan block
+    code_point = np.frombuffer(''.join(tibetan_list).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    letter_id = code_point - 0xF00
+    letter_id[letter_id >= 256] = 256
+    return TIBETAN_CODE_TABLE[letter_id]
 
 def short_to_tall(short: str) -> str:
     """
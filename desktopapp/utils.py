@@ -40,6 +40,8 @@ class BoCheckApp:
         # Create Text Box for Input
         self.text_box = ScrolledText(root, wrap='word', height=8, font=("Arial", 12), bg="#fff", bd=1, relief="solid")
         self.text_box.pack(padx=10, pady=10, fill="x")
+        # Highlight for syllables that fail the spelling check
+        self.text_box.tag_config("error", background="#ffcdd2")
 
         # Adding Language Selection Buttons
         self.create_language_buttons()
@@ -126,26 +128,19 @@ class BoCheckApp:
     def process_input(self):
         """
         Processes the text input by calling methods for Tibetan component recognition and spelling checks.
-        Displays the results in the result text box.
+        Displays the results in the result text box and highlights the misspelled syllables in the input.
         """
-        text = self.text_box.get("1.0", tk.END).strip()
-        if not text:
+        text = self.text_box.get("1.0", "end-1c")
+        if not text.strip():
             messagebox.showerror("Error", "Please provide text input or upload a file.")
             return
 
         checker = Checker()
-        recognization_result = checker.recognization_text(text)
-        check_result = checker.check_text(text)
-
-        if recognization_result is not None and check_result is not None:
-            result = recognization_result
-            result['拼写检查'] = check_result['拼写检查']
-            table_result = pd.DataFrame(result)
-        elif recognization_result is None and check_result is not None:
-            table_result = pd.DataFrame(check_result)
-        elif recognization_result is not None and check_result is None:
-            table_result = pd.DataFrame(recognization_result)
-        else:
+        table_result = checker.analyze(text, offsets=True)
+        self.text_box.tag_remove("error", "1.0", tk.END)
+        for start, end in table_result.loc[~table_result['拼写检查'].astype(bool), ['起始位置', '结束位置']].values:
+            self.text_box.tag_add("error", "1.0+{}c".format(start), "1.0+{}c".format(end))
+        if table_result.empty:
             table_result = pd.DataFrame(["No results available."])
         
         self.result_text.delete(1.0, tk.END)
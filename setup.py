@@ -19,4 +19,7 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     python_requires='>=3.6',
+    entry_points={
+        'console_scripts': ['bocheck = BoCheck.cli:main'],
+    },
 )
\ No newline at end of file
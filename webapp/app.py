@@ -2,7 +2,7 @@ from flask import Flask, request, render_template, redirect, url_for, flash, sen
 import os
 from BoCheck.load import read_txt, read_docx, get_file_extension
 from werkzeug.utils import secure_filename
-from utils import process_text
+from utils import process_text, get_checker
 
 # Initialize the Flask app
 app = Flask(__name__)
@@ -16,6 +16,9 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Make sure the upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Build and warm up the shared checker before serving, so that requests do not pay for it
+get_checker()
+
 
 def allowed_file(filename):
     """
@@ -76,7 +79,7 @@ def index():
             return redirect(request.url)
 
         # Process the text
-        result = process_text(text)
+        result = process_text(text, offsets=True)
 
         # Convert result to HTML table if available
         if result is not None:
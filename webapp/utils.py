@@ -1,41 +1,59 @@
 import os
 import sys
+import threading
 import BoCheck as bc
 
 
-def process_text(text, component_recognization=True, spelling_check=True):
+# Number of distinct syllables whose results are kept and shared by all requests
+CACHE_SIZE = 65536
+# Text analyzed when the checker is built, so that the first request does not fill its tables and
+# common syllables are already cached
+WARMUP_TEXT = "ཡང་དེབ་འདི་ནི་ལས་དབང་འཛོམས་པའི་སྐབས་འགན་འཁྲི་ཞིག་ལྡན་པའི་ཐོག་ནས་ཀློག་པ་པོས་ཤོག་ལྷེ་ཕྱེ་ཡི་ཡོད།"
+
+# Checker of the process, built once by get_checker() and shared by the request threads
+checker = None
+checker_lock = threading.Lock()
+
+
+def get_checker():
+    """
+    Returns the checker of the process, building and warming it up on the first call.
+
+    The checker is shared by all requests, so that none of them pays for encoding the letters and
+    programming the crossbar arrays, and the syllables seen by one request are cached for the
+    others. It is safe to use from several threads: its cache is locked, and its other tables are
+    only ever filled with the same values.
+
+    Returns:
+    Checker: The checker of the process.
+    """
+    global checker
+    if checker is None:
+        with checker_lock:
+            if checker is None:
+                new_checker = bc.Checker(cache_size=CACHE_SIZE)
+                new_checker.analyze(WARMUP_TEXT)
+                checker = new_checker
+    return checker
+
+
+def process_text(text, component_recognization=True, spelling_check=True, offsets=False):
     """
     Process text by performing component recognition and spelling check.
 
     This function takes a string of text and performs two optional tasks: 
     component recognition and spelling check. Both tasks are executed 
-    by the Checker class. If both tasks are selected, the results 
-    are combined and returned as a single dictionary.
+    together in a single pass by Checker.analyze.
 
     Parameters:
     text (str): The input text to be processed.
     component_recognization (bool): If True, performs component recognition on the text.
     spelling_check (bool): If True, performs a spelling check on the text.
+    offsets (bool): If True, adds the start and end offsets of each syllable in the text.
 
     Returns:
-    dict or None: A dictionary containing the results of the component recognition 
+    pd.DataFrame or None: A DataFrame containing the results of the component recognition 
     and/or spelling check, depending on the options selected. Returns None if no tasks are performed.
     """
-    checker = bc.Checker()
-    # Perform component recognition if enabled
-    recognization_result = checker.recognization_text(text) if component_recognization else None
-    # Perform spelling check if enabled
-    check_result = checker.check_text(text) if spelling_check else None
-
-    # Combine results based on which tasks were performed
-    if recognization_result is not None and check_result is not None:
-        result = recognization_result
-        result['拼写检查'] = check_result['拼写检查']
-    elif recognization_result is None and check_result is not None:
-        result = check_result
-    elif recognization_result is not None and check_result is None:
-        result = recognization_result
-    else:
-        result = None
-
-    return result
+    # Perform component recognition and spelling check together, with the shared checker
+    return get_checker().analyze(text, component_recognization, spelling_check, offsets)